@@ -1,18 +1,76 @@
 import json
 import os
 import sqlite3
+import sys
 import uuid
+from contextlib import contextmanager
 
+try:
+    import orjson
+except ImportError:  # Optional dependency; falls back to the json module
+    orjson = None
 
-def get_db_connection(db_path):
+
+def _dumps(obj) -> str:
+    """Serialise ``obj`` to a JSON string, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _loads(data):
+    """Parse a JSON string, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def get_db_connection(db_path, check_same_thread=True):
     """
     Get a SQLite3 connection.
+
+    Args:
+        db_path: Path to the SQLite database
+        check_same_thread: Passed to sqlite3.connect; disable it for a
+            long-lived connection that is created in one thread and used
+            by another (e.g. a Monitor started from the daemon).
     """
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+def open_persistent_connection(db_path):
+    """
+    Open a connection meant to be kept open and shared across many calls.
+
+    The connection uses WAL journaling with synchronous=NORMAL so that
+    frequent small writes don't each wait on a full fsync.
+    """
+    conn = get_db_connection(db_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+@contextmanager
+def managed_connection(db_path, conn=None):
+    """
+    Yield ``conn`` if given, otherwise a fresh connection to ``db_path``.
+
+    Only connections opened here are closed on exit; a caller-supplied
+    connection stays open for reuse.
+    """
+    if conn is not None:
+        yield conn
+        return
+    own_conn = get_db_connection(db_path)
+    try:
+        yield own_conn
+    finally:
+        own_conn.close()
+
+
 def migrate_db_schema(db_path: str):
     """
     Migrate database schema to support new directory fields.
@@ -45,12 +103,22 @@ def migrate_db_schema(db_path: str):
         conn.close()
 
 
-def init_db(db_path: str):
+def init_db(db_path: str, conn=None):
     """
     Initialize the SQLite database with the required tables.
+
+    Pass ``conn`` to initialize the database behind an open connection, e.g.
+    a ``":memory:"`` database that only exists for that connection.
     """
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    db_dir = os.path.dirname(db_path)
+    if conn is None and db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    with managed_connection(db_path, conn) as conn:
+        _create_schema(conn)
+
+
+def _create_schema(conn):
+    """Create the tables and indexes on ``conn`` if they don't exist."""
     cur = conn.cursor()
 
     # Create events table
@@ -96,8 +164,27 @@ def init_db(db_path: str):
     """
     )
 
+    # Indexes for the per-group lookups done on every monitoring cycle
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS samples_wg_file_epoch
+        ON samples(watch_group, file_path, sample_epoch DESC)
+    """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS samples_wg_epoch
+        ON samples(watch_group, sample_epoch)
+    """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS events_wg_event_epoch
+        ON events(watch_group, event, sample_epoch DESC)
+    """
+    )
+
     conn.commit()
-    conn.close()
 
 
 def insert_event(
@@ -108,34 +195,80 @@ def insert_event(
     event_type=None,
     severity=None,
     affected_files=None,
+    conn=None,
 ):
     """
     Insert an event record into the events table.
+
+    If ``conn`` is given it is used (and left open) instead of opening a
+    new connection to ``db_path``.
     """
-    conn = get_db_connection(db_path)
-    cur = conn.cursor()
-    event_uid = str(uuid.uuid4())
-    cur.execute(
-        """
-        INSERT INTO events (event_uid, watch_group, event, event_type, severity, affected_files, sample_epoch)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """,
+    with managed_connection(db_path, conn) as conn:
+        cur = conn.cursor()
+        event_uid = str(uuid.uuid4())
+        cur.execute(
+            """
+            INSERT INTO events (event_uid, watch_group, event, event_type, severity, affected_files, sample_epoch)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            (
+                event_uid,
+                watch_group,
+                event,
+                event_type,
+                severity,
+                _dumps(affected_files),
+                sample_epoch,
+            ),
+        )
+        conn.commit()
+
+
+def insert_events(db_path, watch_group, sample_epoch, events, conn=None):
+    """
+    Insert several event records into the events table in one transaction.
+
+    Args:
+        db_path: Path to the SQLite database
+        watch_group: Name of the watch group
+        sample_epoch: Timestamp of the sample the events belong to
+        events: Iterable of (event, event_type, severity, affected_files)
+            tuples
+        conn: Optional open connection to use instead of opening one
+    """
+    rows = [
         (
-            event_uid,
+            str(uuid.uuid4()),
             watch_group,
             event,
             event_type,
             severity,
-            json.dumps(affected_files),
+            _dumps(affected_files),
             sample_epoch,
-        ),
-    )
-    conn.commit()
-    conn.close()
+        )
+        for event, event_type, severity, affected_files in events
+    ]
+    if not rows:
+        return
+    with managed_connection(db_path, conn) as conn:
+        # Commits once on success, rolls back every row on error.
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO events (event_uid, watch_group, event, event_type, severity, affected_files, sample_epoch)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                rows,
+            )
 
 
 def insert_sample_record(
-    db_path: str, watch_group: str, sample_epoch: int, file_path: str, file_data: dict
+    db_path: str,
+    watch_group: str,
+    sample_epoch: int,
+    file_path: str,
+    file_data: dict,
+    conn: sqlite3.Connection = None,
 ):
     """
     Insert a sample record with full metrics support.
@@ -146,145 +279,139 @@ def insert_sample_record(
         sample_epoch: Timestamp of the sample
         file_path: Path to the file/directory
         file_data: Dictionary containing file/directory metrics
+        conn: Optional open connection to use instead of opening one
     """
-    conn = sqlite3.connect(db_path)
-    cur = conn.cursor()
-
-    try:
-        cur.execute(
-            """
-            INSERT INTO samples (
-                watch_group, sample_epoch, file_path, type,
-                size, user_id, group_id, mode,
-                last_modified, creation_time, md5, sha256,
-                pattern_found, is_dir, files_count, subdirs_count
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-            (
-                watch_group,
-                sample_epoch,
-                file_path,
-                file_data.get("type"),
-                file_data.get("size"),
-                file_data.get("user_id"),
-                file_data.get("group_id"),
-                file_data.get("mode"),
-                file_data.get("last_modified"),
-                file_data.get("creation_time"),
-                file_data.get("md5"),
-                file_data.get("sha256"),
-                file_data.get("pattern_found"),
-                file_data.get("is_dir", False),
-                file_data.get("files_count"),
-                file_data.get("subdirs_count"),
-            ),
-        )
-
-        conn.commit()
-
-    except Exception as e:
-        conn.rollback()
-        raise e
-
-    finally:
-        conn.close()
-
-
-def get_last_event_for_rule(db_path, watch_group, rule_name, file_path):
+    with managed_connection(db_path, conn) as conn:
+        cur = conn.cursor()
+
+        try:
+            cur.execute(
+                """
+                INSERT INTO samples (
+                    watch_group, sample_epoch, file_path, type,
+                    size, user_id, group_id, mode,
+                    last_modified, creation_time, md5, sha256,
+                    pattern_found, is_dir, files_count, subdirs_count
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    watch_group,
+                    sample_epoch,
+                    file_path,
+                    file_data.get("type"),
+                    file_data.get("size"),
+                    file_data.get("user_id"),
+                    file_data.get("group_id"),
+                    file_data.get("mode"),
+                    file_data.get("last_modified"),
+                    file_data.get("creation_time"),
+                    file_data.get("md5"),
+                    file_data.get("sha256"),
+                    file_data.get("pattern_found"),
+                    file_data.get("is_dir", False),
+                    file_data.get("files_count"),
+                    file_data.get("subdirs_count"),
+                ),
+            )
+
+            conn.commit()
+
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+
+def get_last_event_for_rule(db_path, watch_group, rule_name, file_path, conn=None):
     """
     Retrieve the most recent event for a given watch_group, rule and file.
     Returns a dict with event data or None if not found.
     """
-    conn = get_db_connection(db_path)
-    cur = conn.cursor()
-    query = """
-        SELECT * FROM events
-        WHERE watch_group = ? AND event = ?
-        ORDER BY sample_epoch DESC LIMIT 1
-    """
-    cur.execute(query, (watch_group, rule_name))
-    row = cur.fetchone()
-    conn.close()
+    with managed_connection(db_path, conn) as conn:
+        cur = conn.cursor()
+        query = """
+            SELECT * FROM events
+            WHERE watch_group = ? AND event = ?
+            ORDER BY sample_epoch DESC LIMIT 1
+        """
+        cur.execute(query, (watch_group, rule_name))
+        row = cur.fetchone()
     if row:
-        affected_files = json.loads(row["affected_files"])
+        affected_files = _loads(row["affected_files"])
         if file_path in affected_files:
             return dict(row)
     return None
 
 
-def get_sample_record(db_path, watch_group, sample_epoch, file_path):
+def get_sample_record(db_path, watch_group, sample_epoch, file_path, conn=None):
     """
     Retrieve the sample record for a given watch_group, sample_epoch, and file_path.
     Returns a dict with sample data or None if not found.
     """
-    conn = get_db_connection(db_path)
-    cur = conn.cursor()
-    query = """
-        SELECT * FROM samples
-        WHERE watch_group = ? AND sample_epoch = ? AND file_path = ?
-        LIMIT 1
-    """
-    cur.execute(query, (watch_group, sample_epoch, file_path))
-    row = cur.fetchone()
-    conn.close()
+    with managed_connection(db_path, conn) as conn:
+        cur = conn.cursor()
+        query = """
+            SELECT * FROM samples
+            WHERE watch_group = ? AND sample_epoch = ? AND file_path = ?
+            LIMIT 1
+        """
+        cur.execute(query, (watch_group, sample_epoch, file_path))
+        row = cur.fetchone()
     if row:
         return dict(row)
     return None
 
 
-def get_last_n_sample_epochs(db_path, watch_group, n_samples=1):
+def get_last_n_sample_epochs(db_path, watch_group, n_samples=1, conn=None):
     """
     Retrieve the last N sample epochs for a given watch_group.
     Returns a list of sample_epoch values.
     """
-    conn = get_db_connection(db_path)
-    cur = conn.cursor()
-    query = """
-        SELECT DISTINCT sample_epoch FROM samples
-        WHERE watch_group = ?
-        ORDER BY sample_epoch DESC
-        LIMIT ?
-    """
-    cur.execute(query, (watch_group, n_samples))
-    rows = cur.fetchall()
-    conn.close()
+    with managed_connection(db_path, conn) as conn:
+        cur = conn.cursor()
+        query = """
+            SELECT DISTINCT sample_epoch FROM samples
+            WHERE watch_group = ?
+            ORDER BY sample_epoch DESC
+            LIMIT ?
+        """
+        cur.execute(query, (watch_group, n_samples))
+        rows = cur.fetchall()
     return [row["sample_epoch"] for row in rows]
 
 
-def get_last_n_samples(db_path, watch_group, file_path=None, n_samples=1):
+def get_last_n_samples(db_path, watch_group, file_path=None, n_samples=1, conn=None):
     """
     Retrieve the sample record for a given watch_group, sample_epoch, and file_path.
     Returns a dict with sample data or None if not found.
     """
-    conn = get_db_connection(db_path)
-    cur = conn.cursor()
+    with managed_connection(db_path, conn) as conn:
+        cur = conn.cursor()
 
-    epochs = get_last_n_sample_epochs(db_path, watch_group, n_samples)
-    if not epochs:
-        return []
+        epochs = get_last_n_sample_epochs(db_path, watch_group, n_samples, conn=conn)
+        if not epochs:
+            return []
 
-    epochs_str = ", ".join(map(str, epochs))
+        epochs_str = ", ".join(map(str, epochs))
 
-    if file_path is None:
-        query = """
-            SELECT * FROM samples
-            WHERE watch_group = ?
-            AND sample_epoch IN (?)
-            ORDER BY sample_epoch DESC
-        """
-        cur.execute(query, (watch_group, epochs_str))
-    else:
-        query = """
-            SELECT * FROM samples
-            WHERE watch_group = ?
-            AND file_path = ?
-            AND sample_epoch IN (?)
-            ORDER BY sample_epoch DESC
-        """
-        cur.execute(query, (watch_group, file_path, epochs_str))
+        if file_path is None:
+            query = """
+                SELECT * FROM samples
+                WHERE watch_group = ?
+                AND sample_epoch IN (?)
+                ORDER BY sample_epoch DESC
+            """
+            cur.execute(query, (watch_group, epochs_str))
+        else:
+            query = """
+                SELECT * FROM samples
+                WHERE watch_group = ?
+                AND file_path = ?
+                AND sample_epoch IN (?)
+                ORDER BY sample_epoch DESC
+            """
+            cur.execute(query, (watch_group, file_path, epochs_str))
 
-    rows = cur.fetchall()
-    conn.close()
+        rows = cur.fetchall()
     if rows:
         samples = {}
         for row in rows:
@@ -299,7 +426,8 @@ def get_last_n_samples(db_path, watch_group, file_path=None, n_samples=1):
             metrics["sha256"] = row["sha256"]
             metrics["pattern_found"] = row["pattern_found"]
             metrics["sample_epoch"] = row["sample_epoch"]
-            samples[row["file_path"]] = metrics
+            # Interned to match the keys of freshly collected samples.
+            samples[sys.intern(row["file_path"])] = metrics
         return samples
     return None
 
@@ -10,15 +10,41 @@ This module provides file and directory monitoring capabilities with support for
 """
 
 import concurrent.futures
+import glob
 import hashlib
 import json
 import logging
 import os
+import sys
+import threading
 import time
+import zlib
+from collections import ChainMap, deque
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Set, Tuple
+from stat import S_ISDIR, S_ISLNK
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
-from eventwatcher import db, rule_helpers
+from eventwatcher import db, rule_helpers, rules
+from eventwatcher.utils import Stoppable
+
+try:
+    import blake3
+except ImportError:  # Optional dependency, only needed for digest: blake3
+    blake3 = None
+
+# Read size used when hashing file contents.
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Files smaller than this are hashed from a single read() call.
+_SMALL_FILE_SIZE = 64 * 1024
+
+# process_entry walks the children of a starting directory on a thread pool
+# of _SCAN_WORKERS threads once it has more than this many subdirectories.
+_PARALLEL_SUBDIR_THRESHOLD = 4
+_SCAN_WORKERS = min(8, os.cpu_count() or 1)
+
+# Names a rule condition sees that differ from one file to the next.
+_PER_FILE_NAMES = frozenset({"file", "prev_file"})
 
 
 class ScanTimeout(Exception):
@@ -42,29 +68,189 @@ class DirectoryMetrics:
             self.children = set()
 
 
-def compute_file_hashes(path: str) -> Tuple[Optional[str], Optional[str]]:
-    """Compute MD5 and SHA256 hashes for a file."""
+def _sha256():
+    # Hashes are used for change detection, not security; this also keeps
+    # SHA256 available on FIPS-restricted OpenSSL builds.
+    return hashlib.new("sha256", usedforsecurity=False)
+
+
+def get_digest_factory(name: str):
+    """
+    Return the hash constructor for a watch group's ``digest`` setting.
+
+    Args:
+        name: One of "sha256" (default), "blake3" (requires the optional
+            blake3 package) or "none" (skip content hashing; change
+            detection then relies on size and modification time).
+
+    Returns:
+        A callable returning a new hash object, or None for "none".
+
+    Raises:
+        ValueError: If the digest is unknown or its package isn't installed.
+    """
+    if name == "sha256":
+        return _sha256
+    if name == "blake3":
+        if blake3 is None:
+            raise ValueError("digest 'blake3' requires the blake3 package")
+        return blake3.blake3
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown digest: {name}")
+
+
+def compute_file_hashes(
+    path: str, compute_md5: bool = True, digest=_sha256
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Compute MD5 and SHA256 hashes for a file.
+
+    ``digest`` is the constructor used for the second hash (see
+    get_digest_factory); its hex digest is returned in the SHA256 slot.
+    When ``compute_md5`` is False or ``digest`` is None the corresponding
+    slot of the returned tuple is None.
+    """
+    if not compute_md5 and digest is None:
+        return None, None
     try:
-        md5 = hashlib.md5()
-        sha256 = hashlib.sha256()
+        return _hash_file(path, compute_md5, digest)
+    except Exception as e:
+        logging.error(f"Error computing hashes for {path}: {e}")
+        return None, None
+
+
+def _hash_file(
+    path: str, compute_md5: bool, digest
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Hash a file for compute_file_hashes, raising on errors.
+
+    Small files are read in one call. When only one hash is wanted the read
+    loop is left to ``hashlib.file_digest``.
+    """
+    md5 = hashlib.md5(usedforsecurity=False) if compute_md5 else None
+    sha256 = digest() if digest is not None else None
+
+    with open(path, "rb", buffering=0) as f:
+        if os.fstat(f.fileno()).st_size < _SMALL_FILE_SIZE:
+            data = f.read()
+            for h in (md5, sha256):
+                if h is not None:
+                    h.update(data)
+        elif md5 is None or sha256 is None:
+            only = md5 if md5 is not None else sha256
+            hashlib.file_digest(f, lambda: only)
+        else:
+            # Read in chunks into one reusable buffer to handle large files
+            # without allocating a new bytes object per chunk.
+            buf = bytearray(_HASH_CHUNK_SIZE)
+            view = memoryview(buf)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                md5.update(view[:n])
+                sha256.update(view[:n])
+
+    return (
+        md5.hexdigest() if md5 is not None else None,
+        sha256.hexdigest() if sha256 is not None else None,
+    )
+
+
+class FileHashCache:
+    """
+    File hashes of the last sample, reused for files that haven't changed.
+
+    An entry is reused while the file's size, mtime, ctime and inode all
+    match the stat result it was computed from; ctime also catches rewrites
+    that restore the old mtime. Each call to ``rotate`` (once per sample)
+    keeps only the entries used since the previous one, so the cache always
+    holds exactly the files of the last scan however many there are.
+    """
+
+    def __init__(self):
+        self._previous: Dict[str, tuple] = {}
+        self._current: Dict[str, tuple] = {}
+
+    def get(
+        self, path: str, stat: os.stat_result, compute_md5: bool, digest
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Return the hashes of ``path``, computing them only if it changed."""
+        key = (
+            stat.st_size,
+            stat.st_mtime_ns,
+            stat.st_ctime_ns,
+            stat.st_ino,
+            compute_md5,
+            digest,
+        )
+        cached = self._current.get(path) or self._previous.get(path)
+        if cached is not None and cached[0] == key:
+            hashes = cached[1]
+        else:
+            hashes = _hash_file(path, compute_md5, digest)
+        self._current[path] = (key, hashes)
+        return hashes
 
-        with open(path, "rb") as f:
-            # Read in chunks to handle large files
-            for chunk in iter(lambda: f.read(65536), b""):
-                md5.update(chunk)
-                sha256.update(chunk)
+    def rotate(self):
+        """Start a new sample, dropping entries not used in the last one."""
+        self._previous, self._current = self._current, {}
 
-        return md5.hexdigest(), sha256.hexdigest()
+
+def _file_hashes_for_stat(
+    path: str,
+    stat: os.stat_result,
+    compute_md5: bool = True,
+    digest=_sha256,
+    hash_cache: Optional[FileHashCache] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Like compute_file_hashes, but reuse earlier results for unchanged files.
+
+    ``stat`` must be the file's current stat result. With a ``hash_cache``
+    the hashes are only recomputed when the file changed since the last
+    sample (see FileHashCache); without one they are always computed.
+    """
+    if not compute_md5 and digest is None:
+        return None, None
+    try:
+        if hash_cache is None:
+            return _hash_file(path, compute_md5, digest)
+        return hash_cache.get(path, stat, compute_md5, digest)
     except Exception as e:
         logging.error(f"Error computing hashes for {path}: {e}")
         return None, None
 
 
 def check_file_pattern(path: str, pattern: str) -> Optional[bool]:
-    """Check if a pattern exists in a file."""
+    """
+    Check if a pattern exists in a file.
+
+    The file is read in chunks into one reusable buffer and searched for the
+    UTF-8 encoded pattern, so it is neither held in memory as a whole nor
+    decoded. The last ``len(pattern) - 1`` bytes of each chunk are carried
+    over so matches spanning a chunk boundary are found. Reading until EOF
+    rather than trusting st_size also searches special files such as those
+    under /proc, which report a size of zero.
+    """
+    needle = pattern.encode()
+    overlap = max(len(needle) - 1, 0)
     try:
-        with open(path, "r", errors="ignore") as f:
-            return pattern in f.read()
+        buf = bytearray(_HASH_CHUNK_SIZE + overlap)
+        view = memoryview(buf)
+        kept = 0
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                n = f.readinto(view[kept:])
+                if not n:
+                    return False
+                end = kept + n
+                if buf.find(needle, 0, end) != -1:
+                    return True
+                kept = min(overlap, end)
+                buf[:kept] = buf[end - kept : end]
     except Exception as e:
         logging.error(f"Error checking pattern in {path}: {e}")
         return None
@@ -122,26 +308,36 @@ def _collect_dir_metrics(path: str, collect_children: bool = False) -> Optional[
         subdirs_count = 0
         children = set() if collect_children else None
 
-        for entry in os.scandir(path):
+        # Walk the tree with an explicit stack instead of recursing, so deep
+        # trees neither pay a Python call per directory nor hit the
+        # recursion limit.
+        pending = [path]
+        while pending:
+            current = pending.pop()
             try:
-                if collect_children:
-                    children.add(entry.path)
-
-                if entry.is_file(follow_symlinks=False):
-                    files_count += 1
-                    total_size += entry.stat().st_size
-                elif entry.is_dir(follow_symlinks=False):
-                    subdirs_count += 1
-                    # Recursively get subdirectory size
-                    subdir_metrics = _collect_dir_metrics(entry.path)
-                    if subdir_metrics:
-                        total_size += subdir_metrics[0]
-                        files_count += subdir_metrics[1]
-                        subdirs_count += subdir_metrics[2]
-            except (OSError, PermissionError) as e:
-                logging.warning(f"Error accessing {entry.path}: {e}")
+                entries = os.scandir(current)
+            except OSError as e:
+                if current == path:
+                    raise
+                logging.error(f"Error in _collect_dir_metrics for {current}: {e}")
                 continue
 
+            with entries:
+                for entry in entries:
+                    try:
+                        if collect_children and current == path:
+                            children.add(entry.path)
+
+                        if entry.is_file(follow_symlinks=False):
+                            files_count += 1
+                            total_size += entry.stat().st_size
+                        elif entry.is_dir(follow_symlinks=False):
+                            subdirs_count += 1
+                            pending.append(entry.path)
+                    except (OSError, PermissionError) as e:
+                        logging.warning(f"Error accessing {entry.path}: {e}")
+                        continue
+
         if collect_children:
             return total_size, files_count, subdirs_count, children
         return total_size, files_count, subdirs_count
@@ -156,19 +352,127 @@ def process_entry(
     max_depth: int = 1,
     current_depth: int = 1,
     pattern: Optional[str] = None,
+    compute_md5: bool = True,
+    digest=_sha256,
+    hash_cache: Optional[FileHashCache] = None,
 ):
     """
     Process any filesystem entry (file or directory) and collect its metrics.
     This unified function handles both files and directories, eliminating code duplication.
+
+    Directories within ``max_depth`` are walked breadth-first with an
+    explicit queue rather than by recursion. When the starting directory has
+    more than _PARALLEL_SUBDIR_THRESHOLD subdirectories, its children are
+    walked concurrently on a thread pool (stat, scandir and hashing release
+    the GIL); each child collects into its own dict and the results are
+    merged in order.
     """
-    try:
-        if not os.path.exists(path):
-            logging.warning(f"Path does not exist: {path}")
-            return
+    pending = deque([(path, current_depth, None, None)])
+    _walk_entries(
+        pending,
+        sample,
+        max_depth,
+        pattern,
+        compute_md5,
+        digest,
+        hash_cache,
+        limit=1,
+    )
+    subdirs = sum(1 for item in pending if item[3])
+    if subdirs <= _PARALLEL_SUBDIR_THRESHOLD or _SCAN_WORKERS < 2:
+        _walk_entries(
+            pending, sample, max_depth, pattern, compute_md5, digest, hash_cache
+        )
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as executor:
+        tasks = []
+        for item in pending:
+            partial = {}
+            future = executor.submit(
+                _walk_entries,
+                deque([item]),
+                partial,
+                max_depth,
+                pattern,
+                compute_md5,
+                digest,
+                hash_cache,
+            )
+            tasks.append((partial, future))
+        for partial, future in tasks:
+            future.result()
+            sample.update(partial)
 
-        # Get basic stats that apply to both files and directories
-        stat = os.stat(path)
-        is_directory = os.path.isdir(path) and not os.path.islink(path)
+
+def _walk_entries(
+    pending: deque,
+    sample: dict,
+    max_depth: int,
+    pattern: Optional[str],
+    compute_md5: bool,
+    digest,
+    hash_cache: Optional[FileHashCache],
+    limit: Optional[int] = None,
+):
+    """
+    Process queued entries breadth-first, queueing directory children.
+
+    Stops after ``limit`` entries if given, leaving the rest in ``pending``.
+    """
+    processed = 0
+    while pending and (limit is None or processed < limit):
+        entry_path, depth, st, is_directory = pending.popleft()
+        _process_single_entry(
+            entry_path,
+            depth,
+            sample,
+            max_depth,
+            pattern,
+            compute_md5,
+            digest,
+            hash_cache,
+            pending,
+            st,
+            is_directory,
+        )
+        processed += 1
+
+
+def _process_single_entry(
+    path: str,
+    current_depth: int,
+    sample: dict,
+    max_depth: int,
+    pattern: Optional[str],
+    compute_md5: bool,
+    digest,
+    hash_cache: Optional[FileHashCache],
+    pending: deque,
+    stat: Optional[os.stat_result] = None,
+    is_directory: Optional[bool] = None,
+):
+    """
+    Collect the metrics of one entry for process_entry.
+
+    Children of a directory within the depth limit are appended to
+    ``pending`` as ``(path, depth, stat, is_directory)`` tuples instead of
+    being processed here. The stat result and type come from the parent's
+    ``os.scandir`` entry, so children aren't looked up again; only the
+    starting path (passed without them) is stat'ed here.
+    """
+    try:
+        if stat is None:
+            # One lstat answers existence and type; only symlinks need a
+            # second stat, since their metrics are those of the target.
+            try:
+                stat = os.lstat(path)
+                is_directory = S_ISDIR(stat.st_mode)
+                if S_ISLNK(stat.st_mode):
+                    stat = os.stat(path)
+            except FileNotFoundError:
+                logging.warning(f"Path does not exist: {path}")
+                return
 
         # Initialize base metrics common to both types
         base_metrics = {
@@ -198,23 +502,15 @@ def process_entry(
                                 base_metrics["files_count"] += 1
                                 entry_stat = entry.stat()
                                 total_size += entry_stat.st_size
-                                # Process each file in directory
-                                process_entry(
-                                    entry.path,
-                                    sample,
-                                    max_depth,
-                                    current_depth + 1,
-                                    pattern,
+                                # Queue each file in directory
+                                pending.append(
+                                    (entry.path, current_depth + 1, entry_stat, False)
                                 )
                             elif entry.is_dir(follow_symlinks=False):
                                 base_metrics["subdirs_count"] += 1
-                                # Recursively process subdirectory
-                                process_entry(
-                                    entry.path,
-                                    sample,
-                                    max_depth,
-                                    current_depth + 1,
-                                    pattern,
+                                # Queue subdirectory for processing
+                                pending.append(
+                                    (entry.path, current_depth + 1, entry.stat(), True)
                                 )
                         except OSError as e:
                             logging.error(f"Error accessing {entry.path}: {e}")
@@ -224,64 +520,152 @@ def process_entry(
 
         else:  # File processing
             # Only compute hashes and check pattern for files
-            md5_hash, sha256_hash = compute_file_hashes(path)
+            md5_hash, sha256_hash = _file_hashes_for_stat(
+                path, stat, compute_md5, digest, hash_cache
+            )
             pattern_match = check_file_pattern(path, pattern) if pattern else None
 
             base_metrics.update(
                 {"md5": md5_hash, "sha256": sha256_hash, "pattern_found": pattern_match}
             )
 
-        # Add entry to sample collection
-        sample[path] = base_metrics
+        # Add entry to sample collection. Paths are interned, as are those of
+        # samples loaded from the database, so comparing the two samples
+        # matches keys by identity.
+        sample[sys.intern(path)] = base_metrics
 
-        # Log appropriate information based on entry type
+        # Log appropriate information based on entry type. Arguments are
+        # passed separately so the message is only formatted if emitted.
         if is_directory:
             logging.info(
-                f"Dir: {path} -> files={base_metrics['files_count']}, "
-                f"subdirs={base_metrics['subdirs_count']}, size={base_metrics['size']}"
+                "Dir: %s -> files=%s, subdirs=%s, size=%s",
+                path,
+                base_metrics["files_count"],
+                base_metrics["subdirs_count"],
+                base_metrics["size"],
             )
         else:
             logging.info(
-                f"File: {path} -> size={base_metrics['size']}, "
-                f"uid={base_metrics['user_id']}, md5={base_metrics['md5']}, "
-                f"pattern={base_metrics['pattern_found']}"
+                "File: %s -> size=%s, uid=%s, md5=%s, pattern=%s",
+                path,
+                base_metrics["size"],
+                base_metrics["user_id"],
+                base_metrics["md5"],
+                base_metrics["pattern_found"],
             )
 
     except OSError as e:
         logging.error(f"Error processing entry {path}: {e}")
 
 
-def collect_sample(watch_group: dict, log_dir: str) -> Tuple[dict, int]:
+def _has_glob_magic(path: str) -> bool:
+    return any(c in path for c in "*?[")
+
+
+class WatchItems:
+    """
+    Watch items of a watch group, classified once as literal paths or globs.
+
+    Glob expansions are cached per pattern. When a pattern's wildcards are
+    confined to its last path component, the cached expansion is reused for
+    as long as the parent directory's modification time is unchanged (adding,
+    removing or renaming an entry updates it), so steady-state cycles cost a
+    single stat() instead of a full glob.
+    """
+
+    def __init__(self, items: List[str]):
+        self.items = [(item, _has_glob_magic(item)) for item in items]
+        self._glob_cache: Dict[str, Tuple[int, List[str]]] = {}
+
+    def expand_glob(self, pattern: str) -> List[str]:
+        """Return the paths matching ``pattern``, reusing a cached result if valid."""
+        parent = os.path.dirname(pattern)
+        if _has_glob_magic(parent):
+            return glob.glob(pattern)
+        try:
+            # Stat before globbing so a change racing the glob invalidates it.
+            parent_mtime = os.stat(parent or os.curdir).st_mtime_ns
+        except OSError:
+            self._glob_cache.pop(pattern, None)
+            return []
+        cached = self._glob_cache.get(pattern)
+        if cached is not None and cached[0] == parent_mtime:
+            return cached[1]
+        paths = glob.glob(pattern)
+        self._glob_cache[pattern] = (parent_mtime, paths)
+        return paths
+
+
+def needs_md5(watch_group: dict) -> bool:
+    """
+    Decide whether file MD5 hashes must be computed for a watch group.
+
+    An explicit ``compute_md5`` setting wins; otherwise MD5 is only needed
+    when a rule expression mentions it, since change detection itself
+    relies on SHA256.
+    """
+    if "compute_md5" in watch_group:
+        return bool(watch_group["compute_md5"])
+    for rule in watch_group.get("rules", []):
+        for key in ("condition", "affected_files_expr"):
+            if "md5" in (rule.get(key) or ""):
+                return True
+    return False
+
+
+def collect_sample(
+    watch_group: dict,
+    log_dir: str,
+    compute_md5: Optional[bool] = None,
+    watch_items: Optional[WatchItems] = None,
+    hash_cache: Optional[FileHashCache] = None,
+) -> Tuple[dict, int]:
     """
     Collect sample data for the watch group. This function now uses a unified approach
     for processing both files and directories through the process_entry function.
+
+    If ``compute_md5`` is None it is derived from the watch group's rules
+    (see needs_md5). The content digest stored in the ``sha256`` field is
+    selected by the watch group's ``digest`` setting (see get_digest_factory).
+    Pass a long-lived ``watch_items`` to reuse glob expansions across calls,
+    and a long-lived ``hash_cache`` to skip re-hashing unchanged files.
     """
     sample = {}
     sample_epoch = int(time.time())
 
     max_depth = watch_group.get("max_depth", 1)
     pattern = watch_group.get("pattern")
+    if compute_md5 is None:
+        compute_md5 = needs_md5(watch_group)
+    digest = get_digest_factory(watch_group.get("digest", "sha256"))
+    if watch_items is None:
+        watch_items = WatchItems(watch_group.get("watch_items", []))
 
     # Process each watch item using the unified process_entry function
-    for item in watch_group.get("watch_items", []):
+    for item, is_glob in watch_items.items:
         try:
-            if any(c in item for c in ["*", "?", "["]):
-                # Handle glob patterns
-                import glob
-
-                paths = glob.glob(item)
+            if is_glob:
+                paths = watch_items.expand_glob(item)
                 logging.info(f"Glob pattern {item} matched paths: {paths}")
-                for path in paths:
-                    process_entry(path, sample, max_depth, pattern=pattern)
             else:
-                # Process single path
-                if os.path.exists(item):
-                    process_entry(item, sample, max_depth, pattern=pattern)
-                else:
-                    logging.warning(f"Path does not exist: {item}")
+                # process_entry warns if a literal path doesn't exist
+                paths = [item]
+            for path in paths:
+                process_entry(
+                    path,
+                    sample,
+                    max_depth,
+                    pattern=pattern,
+                    compute_md5=compute_md5,
+                    digest=digest,
+                    hash_cache=hash_cache,
+                )
         except Exception as e:
             logging.error(f"Error processing watch item {item}: {e}")
 
+    if hash_cache is not None:
+        hash_cache.rotate()
+
     logging.info(f"Collected sample with {len(sample)} entries")
     return sample, sample_epoch
 
@@ -299,35 +683,49 @@ def compare_samples(
     Returns:
         Dict containing differences categorized by type
     """
-    differences = {"new": [], "removed": [], "modified": {}}
-
-    # Find new and modified items
+    # Key-view set operations find added and removed paths in C; they are
+    # sorted so the result doesn't depend on set ordering.
+    differences = {
+        "new": sorted(current.keys() - previous.keys()),
+        "removed": sorted(previous.keys() - current.keys()),
+        "modified": {},
+    }
+
+    # Find modified items
+    skip_fields = {"sample_epoch"}
     for path, curr_metrics in current.items():
-        if path not in previous:
-            differences["new"].append(path)
-        else:
-            prev_metrics = previous[path]
-            changes = {}
-
-            # Compare all metrics except sample-specific ones
-            skip_fields = {"sample_epoch"}
-            for key, curr_value in curr_metrics.items():
-                if key not in skip_fields:
-                    prev_value = prev_metrics.get(key)
-                    if curr_value != prev_value:
-                        changes[key] = {"old": prev_value, "new": curr_value}
+        prev_metrics = previous.get(path)
+        if prev_metrics is None:
+            continue
 
-            if changes:
-                differences["modified"][path] = changes
+        # Compare all metrics except sample-specific ones
+        changes = {}
+        for key, curr_value in curr_metrics.items():
+            if key not in skip_fields:
+                prev_value = prev_metrics.get(key)
+                if curr_value != prev_value:
+                    changes[key] = {"old": prev_value, "new": curr_value}
 
-    # Find removed items
-    for path in previous:
-        if path not in current:
-            differences["removed"].append(path)
+        if changes:
+            differences["modified"][path] = changes
 
     return differences
 
 
+# Event type reported for a change to each (item type, field).
+_FIELD_EVENTS = MappingProxyType(
+    {
+        ("file", "size"): "size_changed",
+        ("file", "last_modified"): "content_modified",
+        ("file", "md5"): "content_changed",
+        ("file", "sha256"): "content_changed",
+        ("directory", "files_count"): "files_changed",
+        ("directory", "subdirs_count"): "subdirs_changed",
+        ("directory", "size"): "dir_size_changed",
+    }
+)
+
+
 def get_event_type(changes: Dict[str, Any], item_type: str = "file") -> str:
     """
     Determine specific event type based on the changes detected.
@@ -339,35 +737,27 @@ def get_event_type(changes: Dict[str, Any], item_type: str = "file") -> str:
     Returns:
         Detailed event type description
     """
-    event_types = []
-
-    for field, change in changes.items():
-        if item_type == "file":
-            if field == "size":
-                event_types.append("size_changed")
-            elif field == "last_modified":
-                event_types.append("content_modified")
-            elif field == "pattern_found":
-                old_val = change.get("old", False)
-                new_val = change.get("new", False)
-                if not old_val and new_val:
-                    event_types.append("pattern_found")
-                elif old_val and not new_val:
-                    event_types.append("pattern_removed")
-            elif field in ("md5", "sha256"):
-                event_types.append("content_changed")
-        else:  # directory
-            if field == "files_count":
-                event_types.append("files_changed")
-            elif field == "subdirs_count":
-                event_types.append("subdirs_changed")
-            elif field == "size":
-                event_types.append("dir_size_changed")
+    kind = "file" if item_type == "file" else "directory"
+    event_types = {
+        _FIELD_EVENTS[kind, field]
+        for field in changes
+        if (kind, field) in _FIELD_EVENTS
+    }
+
+    # The pattern event depends on the direction of the change.
+    if kind == "file" and "pattern_found" in changes:
+        change = changes["pattern_found"]
+        old_val = change.get("old", False)
+        new_val = change.get("new", False)
+        if not old_val and new_val:
+            event_types.add("pattern_found")
+        elif old_val and not new_val:
+            event_types.add("pattern_removed")
 
     if not event_types:
         return "unknown_modification"
 
-    return ",".join(sorted(set(event_types)))
+    return ",".join(sorted(event_types))
 
 
 class Monitor:
@@ -380,7 +770,8 @@ class Monitor:
         log_dir: Directory for log files
         log_level: Logging level to use
         logger: Logger instance
-        _stop: Stop flag for monitoring loop
+        conn: Database connection shared by all cycles (opened on first use)
+        _stop: Event set by stop() to end the monitoring loop
     """
 
     def __init__(
@@ -399,7 +790,13 @@ class Monitor:
         self.db_path = db_path
         self.log_dir = os.path.abspath(log_dir)
         self.log_level = log_level
-        self._stop = False
+        self.conn = None
+        self._need_md5 = needs_md5(watch_group)
+        self._watch_items = WatchItems(watch_group.get("watch_items", []))
+        self._hash_cache = FileHashCache()
+        # Fail early on an unknown or unavailable digest setting.
+        get_digest_factory(watch_group.get("digest", "sha256"))
+        self._stop = threading.Event()
 
         # Print debug info before setting up logger
         print(f"Monitor init - Watch group: {watch_group.get('name')}")
@@ -473,6 +870,49 @@ class Monitor:
             )
             return basic_logger
 
+    def get_connection(self):
+        """
+        Return the monitor's database connection, opening it on first use.
+
+        The connection is kept open across monitoring cycles so each insert
+        and query doesn't pay for opening the database file again.
+        """
+        if self.conn is None:
+            self.conn = db.open_persistent_connection(self.db_path)
+        return self.conn
+
+    def close(self):
+        """Close the monitor's database connection, if open."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _evaluate_condition(
+        self, rule: dict, file_context: Mapping, cycle_results: Optional[dict]
+    ) -> Any:
+        """
+        Evaluate a rule condition for one file.
+
+        A condition that references none of the per-file names (file,
+        prev_file) has the same value for every file in the cycle, so it is
+        evaluated once and its result, or error, is reused via cycle_results.
+        """
+        if cycle_results is None or rules.condition_names(rule) & _PER_FILE_NAMES:
+            return rules.evaluate_condition(rule, rules._EVAL_GLOBALS, file_context)
+        key = id(rule)
+        if key not in cycle_results:
+            try:
+                cycle_results[key] = (
+                    rules.evaluate_condition(rule, rules._EVAL_GLOBALS, file_context),
+                    None,
+                )
+            except Exception as e:
+                cycle_results[key] = (None, e)
+        result, error = cycle_results[key]
+        if error is not None:
+            raise error
+        return result
+
     def evaluate_rule_for_file(
         self,
         rule: dict,
@@ -480,6 +920,7 @@ class Monitor:
         file_path: str,
         sample: dict,
         previous_sample: Optional[dict],
+        cycle_results: Optional[dict] = None,
     ) -> Tuple[bool, Optional[str]]:
         """
         Evaluate a rule for a specific file, checking if it actually changed.
@@ -490,33 +931,35 @@ class Monitor:
             file_path: Path to the file being evaluated
             sample: Current sample data
             previous_sample: Previous sample data
+            cycle_results: Per-cycle cache for file-independent conditions
+                (see _evaluate_condition)
 
         Returns:
             Tuple of (triggered, event_type)
         """
+        current = sample.get(file_path)
+        previous = previous_sample.get(file_path) if previous_sample else None
+
         # First check if the file actually changed
-        if file_path not in sample or (
-            previous_sample
-            and file_path in previous_sample
+        if current is None or (
+            previous is not None
             and all(
-                sample[file_path].get(k) == previous_sample[file_path].get(k)
-                for k in sample[file_path]
+                value == previous.get(k)
+                for k, value in current.items()
                 if k != "sample_epoch"
             )
         ):
             return False, None
 
-        # Now evaluate the rule condition
-        file_context = context.copy()
-        file_context["file"] = sample.get(file_path, {})
-        file_context["prev_file"] = (
-            previous_sample.get(file_path, {}) if previous_sample else {}
+        # Now evaluate the rule condition, layering the per-file names over
+        # the shared context rather than copying it for every file.
+        file_context = ChainMap(
+            {"file": current, "prev_file": previous if previous is not None else {}},
+            context,
         )
 
         try:
-            triggered = eval(
-                rule["condition"], rule_helpers.build_safe_eval_context(), file_context
-            )
+            triggered = self._evaluate_condition(rule, file_context, cycle_results)
         except Exception as e:
             self.logger.error(f"Error evaluating rule for file {file_path}: {e}")
             return False, None
@@ -526,15 +969,10 @@ class Monitor:
 
         # Determine the specific type of change
         changes = {}
-        if previous_sample and file_path in previous_sample:
-            for key, value in sample[file_path].items():
-                if key != "sample_epoch" and value != previous_sample[file_path].get(
-                    key
-                ):
-                    changes[key] = {
-                        "old": previous_sample[file_path].get(key),
-                        "new": value,
-                    }
+        if previous is not None:
+            for key, value in current.items():
+                if key != "sample_epoch" and value != previous.get(key):
+                    changes[key] = {"old": previous.get(key), "new": value}
 
         event_type = get_event_type(changes) if changes else "created"
         return True, event_type
@@ -548,11 +986,20 @@ class Monitor:
         """
         try:
             self.logger.info("Starting monitoring cycle.")
-            sample, sample_epoch = collect_sample(self.watch_group, self.log_dir)
+            sample, sample_epoch = collect_sample(
+                self.watch_group,
+                self.log_dir,
+                compute_md5=self._need_md5,
+                watch_items=self._watch_items,
+                hash_cache=self._hash_cache,
+            )
             watch_group_name = self.watch_group.get("name", "Unnamed")
+            conn = self.get_connection()
 
             # Get previous sample
-            previous_sample = db.get_last_n_samples(self.db_path, watch_group_name)
+            previous_sample = db.get_last_n_samples(
+                self.db_path, watch_group_name, conn=conn
+            )
 
             # Compare samples and get detailed differences
             if previous_sample:
@@ -562,9 +1009,12 @@ class Monitor:
                     or differences["removed"]
                     or differences["modified"]
                 ):
-                    self.logger.debug(
-                        f"Found differences: {json.dumps(differences, indent=2)}"
-                    )
+                    # json.dumps of a large diff is costly; only build it
+                    # when DEBUG output is actually enabled.
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug(
+                            "Found differences: %s", json.dumps(differences, indent=2)
+                        )
 
                     # Log removals specifically
                     if differences["removed"]:
@@ -586,6 +1036,7 @@ class Monitor:
                         sample_epoch,
                         file_path,
                         file_data,
+                        conn=conn,
                     )
                 except Exception as e:
                     self.logger.error(f"Error inserting sample record: {e}")
@@ -599,11 +1050,12 @@ class Monitor:
             context = {
                 "data": sample,
                 "now": now,
-                "aggregate": rule_helpers.aggregate_metric,
+                "aggregate": rule_helpers.make_indexed_aggregate(sample),
                 "differences": differences,
             }
 
             triggered_events = []
+            cycle_results = {}
 
             # Process each rule
             for rule in self.watch_group.get("rules", []):
@@ -612,7 +1064,12 @@ class Monitor:
                 # Check new files
                 for file_path in differences["new"]:
                     triggered, event_type = self.evaluate_rule_for_file(
-                        rule, context, file_path, sample, previous_sample
+                        rule,
+                        context,
+                        file_path,
+                        sample,
+                        previous_sample,
+                        cycle_results,
                     )
                     if triggered:
                         affected_files.add((file_path, event_type or "created"))
@@ -620,7 +1077,12 @@ class Monitor:
                 # Check modified files
                 for file_path in differences["modified"]:
                     triggered, event_type = self.evaluate_rule_for_file(
-                        rule, context, file_path, sample, previous_sample
+                        rule,
+                        context,
+                        file_path,
+                        sample,
+                        previous_sample,
+                        cycle_results,
                     )
                     if triggered:
                         affected_files.add((file_path, event_type or "modified"))
@@ -628,13 +1090,12 @@ class Monitor:
                 # Check removed files
                 for file_path in differences["removed"]:
                     # Special handling for removed files since they're not in current sample
-                    file_context = context.copy()
-                    file_context["file"] = previous_sample.get(file_path, {})
+                    file_context = ChainMap(
+                        {"file": previous_sample.get(file_path, {})}, context
+                    )
                     try:
-                        triggered = eval(
-                            rule["condition"],
-                            rule_helpers.build_safe_eval_context(),
-                            file_context,
+                        triggered = self._evaluate_condition(
+                            rule, file_context, cycle_results
                         )
                         if triggered:
                             affected_files.add((file_path, "removed"))
@@ -645,31 +1106,35 @@ class Monitor:
 
                 # Create events for affected files
                 for file_path, event_type in affected_files:
-                    try:
-                        # Insert event with specific event type
-                        db.insert_event(
-                            self.db_path,
-                            watch_group_name,
-                            rule["name"],
-                            sample_epoch,
-                            event_type=event_type,
-                            severity=rule.get("severity"),
-                            affected_files=[file_path],
-                        )
+                    triggered_events.append(
+                        {
+                            "rule": rule["name"],
+                            "event_type": event_type,
+                            "severity": rule.get("severity"),
+                            "affected_file": file_path,
+                            "sample_epoch": sample_epoch,
+                        }
+                    )
 
-                        triggered_events.append(
-                            {
-                                "rule": rule["name"],
-                                "event_type": event_type,
-                                "severity": rule.get("severity"),
-                                "affected_file": file_path,
-                                "sample_epoch": sample_epoch,
-                            }
-                        )
-                    except Exception as e:
-                        self.logger.error(
-                            f"Error creating event for {file_path} under rule '{rule.get('name')}': {e}"
+            # Store all of the cycle's events in a single transaction.
+            try:
+                db.insert_events(
+                    self.db_path,
+                    watch_group_name,
+                    sample_epoch,
+                    [
+                        (
+                            event["rule"],
+                            event["event_type"],
+                            event["severity"],
+                            [event["affected_file"]],
                         )
+                        for event in triggered_events
+                    ],
+                    conn=conn,
+                )
+            except Exception as e:
+                self.logger.error(f"Error storing {len(triggered_events)} events: {e}")
 
             self.logger.info("Monitoring cycle completed.")
             return sample, triggered_events
@@ -679,19 +1144,71 @@ class Monitor:
             raise
 
     def run(self):
-        """Run the monitor continuously."""
-        while not self._stop:
-            try:
-                self.run_once()
-                sample_rate = max(
-                    self.watch_group.get("sample_rate", 60), 60
-                )  # Minimum 60 seconds
-                time.sleep(sample_rate)
-            except Exception as e:
-                self.logger.error(f"Error in monitor run loop: {e}")
-                time.sleep(60)  # Wait before retrying
+        """
+        Run the monitor continuously.
+
+        Cycles are scheduled on a fixed monotonic grid (``sample_rate``
+        seconds apart) rather than sleeping ``sample_rate`` after each cycle,
+        so slow cycles don't make the period drift. The first cycle is offset
+        by a stable per-group phase so that groups started together don't
+        all scan the filesystem and write to the database at the same time.
+        """
+        sample_rate = max(
+            self.watch_group.get("sample_rate", 60), 60
+        )  # Minimum 60 seconds
+        wg_name = self.watch_group.get("name", "Unnamed")
+        next_tick = time.monotonic() + zlib.crc32(wg_name.encode()) % sample_rate
+
+        try:
+            while not self._stop.is_set():
+                # Wait for the next tick, waking immediately if stop() is called.
+                delay = next_tick - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+                try:
+                    self.run_once()
+                except Exception as e:
+                    self.logger.error(f"Error in monitor run loop: {e}")
+
+                next_tick += sample_rate
+                now = time.monotonic()
+                if next_tick < now:
+                    # The cycle overran; skip the missed ticks instead of
+                    # running them back to back.
+                    missed = int((now - next_tick) // sample_rate) + 1
+                    next_tick += missed * sample_rate
+                    self.logger.warning(
+                        f"Monitoring cycle overran sample_rate; skipped {missed} tick(s)."
+                    )
+        finally:
+            # Closed here rather than in stop(), which is called from another
+            # thread while a cycle may still be using the connection.
+            self.close()
 
     def stop(self):
         """Stop the monitor."""
-        self._stop = True
+        self._stop.set()
         self.logger.info("Monitor stopping.")
+
+
+class MonitorThread(Stoppable, threading.Thread):
+    """
+    A thread running ``Monitor.run``, which can be registered with ThreadManager.
+
+    stop() stops the monitor, which ends the thread after its current cycle.
+    """
+
+    def __init__(self, monitor: Monitor):
+        """
+        Initialize the monitor thread.
+
+        Args:
+            monitor: The monitor to run
+        """
+        name = monitor.watch_group.get("name", "Unnamed")
+        super().__init__(target=monitor.run, name=f"Monitor-{name}", daemon=True)
+        self.monitor = monitor
+
+    def stop(self):
+        """Signal the monitor to stop."""
+        self.monitor.stop()
@@ -5,7 +5,47 @@ This module provides helper functions for evaluating rules and a set of safe
 built-in functions that can be used in rule conditions.
 """
 
+import bisect
 import fnmatch
+import functools
+import re
+
+from eventwatcher import db
+
+# Number of glob matchers kept by _glob_matcher. Bounded because rule
+# expressions can build patterns at run time, e.g. match(f, prefix + '*').
+_GLOB_CACHE_SIZE = 512
+
+
+@functools.lru_cache(maxsize=_GLOB_CACHE_SIZE)
+def _glob_matcher(pattern):
+    """
+    Return a predicate that tests a path against a glob pattern.
+
+    Patterns of the form ``prefix*`` (a single trailing wildcard) are reduced
+    to a ``str.startswith`` check; anything else is translated once with
+    ``fnmatch.translate`` and the compiled regex is cached for reuse.
+    """
+    prefix = pattern[:-1]
+    if pattern.endswith("*") and not any(c in prefix for c in "*?["):
+
+        def matcher(key):
+            return key.startswith(prefix)
+
+        return matcher
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+def match_glob(path, pattern):
+    """
+    Return whether a file path matches a glob pattern.
+
+    Exposed to rule expressions as ``match``, e.g.
+    ``[f for f in data if match(f, '*.log')]``. Patterns are compiled once and
+    cached, so repeated calls only pay for the match itself.
+    """
+    return bool(_glob_matcher(pattern)(path))
+
 
 # Define safe built-in functions that can be used in rule expressions
 SAFE_BUILTINS = {
@@ -24,6 +64,7 @@ SAFE_BUILTINS = {
     "dict": dict,
     "set": set,
     "round": round,
+    "match": match_glob,
 }
 
 
@@ -40,42 +81,139 @@ def aggregate_metric(data, pattern, metric, func=min):
     Returns:
         The aggregated value, or 0 if no matching files or metric values are found.
     """
-    values = [
-        entry.get(metric)
-        for key, entry in data.items()
-        if fnmatch.fnmatch(key, pattern) and entry.get(metric) is not None
-    ]
+    return _aggregate(data, data.keys(), pattern, metric, func)
+
+
+def _aggregate(data, keys, pattern, metric, func):
+    """Aggregate ``metric`` over the entries of ``data`` whose key is in ``keys``."""
+    match = _glob_matcher(pattern)
+    values = (data[key].get(metric) for key in keys if match(key))
+    values = (value for value in values if value is not None)
+    # The common reductions consume the values as they are produced; other
+    # functions get a list, as before.
+    if func is min or func is max:
+        return func(values, default=0)
+    if func is sum:
+        return sum(values)
+    values = list(values)
     if not values:
         return 0
     return func(values)
 
 
-def get_previous_metric(db_path, watch_group, file_pattern, metric, order="DESC"):
+def _literal_prefix(pattern):
+    """Return the part of a glob pattern before its first wildcard character."""
+    for i, c in enumerate(pattern):
+        if c in "*?[":
+            return pattern[:i]
+    return pattern
+
+
+def make_indexed_aggregate(data):
+    """
+    Build an ``aggregate_metric`` variant bound to a sorted index of ``data``.
+
+    The returned function has the same signature as ``aggregate_metric``. When
+    it is called with ``data`` itself, only the keys sharing the pattern's
+    literal prefix are scanned (located by bisection on the sorted keys)
+    instead of every entry in the sample. The index is built lazily on first
+    use, so cycles whose rules never aggregate don't pay for the sort.
+
+    Results are memoized per (pattern, metric, func): rules are evaluated once
+    per file, so the same aggregate is otherwise recomputed for every file in
+    the sample. ``data`` must therefore not change while the function is in use.
+
+    Args:
+        data (dict): Sample data the index is built for.
+
+    Returns:
+        callable: aggregate(data, pattern, metric, func=min)
+    """
+    index = None
+    results = {}
+
+    def aggregate(sample, pattern, metric, func=min):
+        nonlocal index
+        if sample is not data:
+            return aggregate_metric(sample, pattern, metric, func)
+        key = (pattern, metric, func)
+        try:
+            return results[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable func; compute without memoizing.
+            key = None
+        if index is None:
+            index = sorted(data)
+        prefix = _literal_prefix(pattern)
+        start = bisect.bisect_left(index, prefix)
+        end = start
+        while end < len(index) and index[end].startswith(prefix):
+            end += 1
+        result = _aggregate(data, index[start:end], pattern, metric, func)
+        if key is not None:
+            results[key] = result
+        return result
+
+    return aggregate
+
+
+def _file_path_clause(file_pattern):
+    """
+    Build an index-friendly SQL condition on ``file_path`` for a pattern.
+
+    - Glob patterns (containing ``*``, ``?`` or ``[``) use GLOB, bounded by
+      a range on their literal prefix so SQLite can scan the index.
+    - Patterns without any wildcard become a plain equality.
+    - Anything else (SQL ``%``/``_`` wildcards) keeps using LIKE.
+
+    Returns:
+        tuple: (sql_condition, params)
+    """
+    prefix = _literal_prefix(file_pattern)
+    if prefix != file_pattern:
+        if not prefix:
+            return "file_path GLOB ?", (file_pattern,)
+        # U+10FFFF sorts after any character that can follow the prefix.
+        return (
+            "file_path >= ? AND file_path < ? AND file_path GLOB ?",
+            (prefix, prefix + "\U0010ffff", file_pattern),
+        )
+    if "%" not in file_pattern and "_" not in file_pattern:
+        return "file_path = ?", (file_pattern,)
+    return "file_path LIKE ?", (file_pattern,)
+
+
+def get_previous_metric(
+    db_path, watch_group, file_pattern, metric, order="DESC", conn=None
+):
     """
     Retrieve the most recent metric value from samples for a given file pattern.
 
     Args:
         db_path (str): Path to the database.
         watch_group (str): Name of the watch group.
-        file_pattern (str): Glob pattern for file_path.
+        file_pattern (str): Glob pattern for file_path (SQL LIKE patterns
+            using % or _ are still accepted).
         metric (str): The metric to retrieve.
         order (str): 'DESC' for the most recent sample, 'ASC' for the oldest.
+        conn (sqlite3.Connection, optional): Open connection to reuse instead
+            of opening a new one to ``db_path``.
 
     Returns:
         The metric value or None if not found.
     """
-    conn = __import__(
-        "eventwatcher.db", fromlist=["get_db_connection"]
-    ).get_db_connection(db_path)
-    cur = conn.cursor()
-    query = f"""
-        SELECT {metric} FROM samples
-        WHERE watch_group = ? AND file_path LIKE ?
-        ORDER BY sample_epoch {order} LIMIT 1
-    """
-    cur.execute(query, (watch_group, file_pattern))
-    row = cur.fetchone()
-    conn.close()
+    path_clause, path_params = _file_path_clause(file_pattern)
+    with db.managed_connection(db_path, conn) as conn:
+        cur = conn.cursor()
+        query = f"""
+            SELECT {metric} FROM samples
+            WHERE watch_group = ? AND {path_clause}
+            ORDER BY sample_epoch {order} LIMIT 1
+        """
+        cur.execute(query, (watch_group, *path_params))
+        row = cur.fetchone()
     if row:
         return row[0]
     return None
@@ -9,8 +9,390 @@ Rules may also define optional fields:
   - event_type: the type of event (e.g., "modified", "created", etc.)
   - severity: the severity level (e.g., "WARNING", "CRITICAL", etc.)
   - affected_files_expr (optional): a Python expression to determine which files are affected.
+
+Rule expressions are parsed and compiled once; the results are cached on the
+rule dict under keys starting with an underscore, so repeated evaluations skip
+parsing. Conditions that fold to a constant (e.g. "True") are not evaluated at all.
 """
 
+import ast
+import operator
+import symtable
+import threading
+import types
+from collections import ChainMap, OrderedDict
+
+from eventwatcher.rule_helpers import SAFE_BUILTINS
+
+# Binary operators safe to fold at compile time. Exponentiation,
+# multiplication and shifts are left alone since folding them can build
+# huge values from small literals.
+_FOLDABLE_BINOPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+
+
+class _ConstantFolder(ast.NodeTransformer):
+    """Fold operators whose operands are all literal constants."""
+
+    def _fold(self, node, fn):
+        try:
+            value = fn()
+        except Exception:
+            # Leave the error to surface at evaluation time, as before.
+            return node
+        return ast.copy_location(ast.Constant(value), node)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.operand, ast.Constant) and isinstance(node.op, ast.Not):
+            return self._fold(node, lambda: not node.operand.value)
+        return node
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        fn = _FOLDABLE_BINOPS.get(type(node.op))
+        if (
+            fn is not None
+            and isinstance(node.left, ast.Constant)
+            and isinstance(node.right, ast.Constant)
+        ):
+            return self._fold(node, lambda: fn(node.left.value, node.right.value))
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        operands = [node.left, *node.comparators]
+        if all(isinstance(o, ast.Constant) for o in operands):
+            expr = ast.fix_missing_locations(ast.Expression(node))
+            code = compile(expr, "<fold>", "eval")
+            return self._fold(node, lambda: eval(code, {"__builtins__": {}}))
+        return node
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        is_and = isinstance(node.op, ast.And)
+        values = list(node.values)
+        # Only leading constants can be resolved: they decide the result or
+        # are skipped, exactly as short-circuit evaluation would do.
+        while values and isinstance(values[0], ast.Constant):
+            if bool(values[0].value) != is_and or len(values) == 1:
+                return values[0]
+            values.pop(0)
+        if len(values) == 1:
+            return values[0]
+        node.values = values
+        return node
+
+
+# Builtins exposed to rule expressions; all are pure functions of their
+# arguments.
+_PURE_BUILTIN_NAMES = frozenset(SAFE_BUILTINS)
+
+# The globals passed to eval(), exposing the same safe builtins as the
+# monitor's evaluation context. Expressions only read these, so they are
+# shared by all calls.
+_EVAL_GLOBALS = {"__builtins__": SAFE_BUILTINS}
+
+# Memoized condition results for rules with a bounded read set, keyed by the
+# condition source, the builtins it ran with and the values of the entries it
+# reads.
+_RESULT_CACHE_SIZE = 1024
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def _read_set(tree):
+    """
+    Return the ``data`` keys a condition reads, or None if that isn't bounded.
+
+    The read set is bounded only when ``data`` is accessed exclusively as
+    ``data['<literal key>']`` and no other context name (such as ``now`` or
+    ``aggregate``) is referenced; only then is the condition's result fully
+    determined by those entries. Names other than ``data`` must be builtins.
+    """
+    keys = set()
+    subscripted = set()
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Subscript)
+            and isinstance(node.value, ast.Name)
+            and node.value.id == "data"
+            and isinstance(node.slice, ast.Constant)
+            and isinstance(node.slice.value, str)
+        ):
+            keys.add(node.slice.value)
+            subscripted.add(id(node.value))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id not in _PURE_BUILTIN_NAMES:
+            if node.id != "data" or id(node) not in subscripted:
+                return None
+    return tuple(sorted(keys))
+
+
+# Attributes rule expressions may use: read-only methods of the dicts,
+# strings and lists found in samples. Anything else, such as a generator's
+# gi_frame, could lead from the expression back to module globals.
+_ALLOWED_ATTRIBUTES = frozenset(
+    {
+        "get",
+        "items",
+        "keys",
+        "values",
+        "startswith",
+        "endswith",
+        "lower",
+        "upper",
+        "strip",
+        "lstrip",
+        "rstrip",
+        "split",
+        "rsplit",
+        "splitlines",
+        "join",
+        "find",
+        "rfind",
+        "count",
+        "index",
+        "replace",
+    }
+)
+
+
+def _validate_expression(tree):
+    """
+    Reject expressions that could reach beyond their context and builtins.
+
+    Restricting builtins alone doesn't make eval() safe: attribute chains
+    like ``().__class__.__base__`` or a generator's ``gi_frame`` lead back
+    to arbitrary objects. Expressions can't contain import statements, and
+    ``__import__`` is rejected with the other dunder names.
+
+    Raises:
+        ValueError: If the expression uses a name starting with a double
+            underscore, an attribute not in _ALLOWED_ATTRIBUTES, or calls
+            something other than a safe builtin, a context name or an
+            allowed method.
+    """
+    nodes = list(ast.walk(tree))
+    # Names bound by the expression itself (comprehension targets, :=).
+    bound = {
+        node.id
+        for node in nodes
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store)
+    }
+    for node in nodes:
+        if isinstance(node, ast.Name) and node.id.startswith("__"):
+            raise ValueError(f"'{node.id}' is not allowed in rule expressions")
+        if isinstance(node, ast.Attribute) and node.attr not in _ALLOWED_ATTRIBUTES:
+            raise ValueError(f"'{node.attr}' is not allowed in rule expressions")
+        if isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name) and func.id not in bound:
+                continue
+            if isinstance(func, ast.Attribute):
+                continue
+            raise ValueError(
+                f"calling '{ast.unparse(func)}' is not allowed in rule expressions"
+            )
+
+
+def _free_names(expr_source):
+    """
+    Return the names an expression reads from its surrounding scope.
+
+    Names bound inside the expression (comprehension targets, ``:=``) are
+    excluded, as are the safe builtins, which are resolved from globals.
+    """
+    source = f"def _r():\n return ({expr_source})\n"
+    table = symtable.symtable(source, "<rule>", "exec")
+    names = set()
+    pending = list(table.get_children())
+    while pending:
+        scope = pending.pop()
+        pending.extend(scope.get_children())
+        names.update(
+            symbol.get_name()
+            for symbol in scope.get_symbols()
+            if symbol.is_referenced() and symbol.is_global()
+        )
+    return tuple(sorted(names - _PURE_BUILTIN_NAMES))
+
+
+def _compile_condition_function(tree, params, filename):
+    """
+    Compile a condition to the code of a function taking ``params``.
+
+    Evaluated as a function body, the condition reads its names from fast
+    locals instead of looking each one up in a locals mapping as eval() does.
+    """
+    source = f"def _r({', '.join(params)}):\n return ({ast.unparse(tree.body)})\n"
+    module = compile(source, filename, "exec")
+    return next(c for c in module.co_consts if isinstance(c, types.CodeType))
+
+
+def _result_cache_key(rule, data, builtins):
+    """
+    Build the memoization key for a rule, or None if it can't be cached.
+
+    The builtins mapping is part of the key by identity: a condition can
+    succeed with one set of builtins and fail with another. Builtins
+    mappings are module-level tables, so their ids stay unique.
+    """
+    read_set = rule.get("_read_set")
+    if read_set is None or not isinstance(data, dict):
+        return None
+    try:
+        entries = tuple(
+            (key, tuple(sorted(data[key].items())) if key in data else None)
+            for key in read_set
+        )
+        key = (rule["_source"], id(builtins), entries)
+        hash(key)
+    except (TypeError, AttributeError):
+        return None
+    return key
+
+
+def _precompile_rule(rule):
+    """
+    Parse, constant-fold and compile the rule's condition, caching the results.
+
+    Sets on the rule:
+      - _source: the condition source the cache was built from
+      - _const_result: the condition's value, if it folds to a constant
+      - _compiled: otherwise, the code of a function computing the condition
+        from its free names (None if constant)
+      - _params: those free names, in parameter order
+      - _eval_code: the condition compiled for eval(), used when one of the
+        free names is missing from the context (see evaluate_condition)
+      - _read_set: the data keys the condition reads, when bounded (see
+        _read_set); such conditions have their results memoized
+      - _names: the names the condition references (see condition_names)
+
+    Recompiles if the condition was changed in place since the last call.
+    """
+    condition = rule["condition"]
+    if rule.get("_source") is condition:
+        return
+    tree = ast.parse(condition.strip(), mode="eval")
+    _validate_expression(tree)
+    tree = ast.fix_missing_locations(_ConstantFolder().visit(tree))
+    rule.pop("_const_result", None)
+    rule.pop("_fn", None)
+    if isinstance(tree.body, ast.Constant):
+        rule["_const_result"] = tree.body.value
+        rule["_compiled"] = None
+        rule["_params"] = ()
+        rule["_eval_code"] = None
+        rule["_read_set"] = None
+        rule["_names"] = frozenset()
+    else:
+        filename = f"<rule:{rule.get('name', 'Unnamed')}>"
+        rule["_params"] = _free_names(ast.unparse(tree.body))
+        rule["_compiled"] = _compile_condition_function(tree, rule["_params"], filename)
+        rule["_eval_code"] = compile(tree, filename, "eval")
+        rule["_read_set"] = _read_set(tree)
+        rule["_names"] = frozenset(
+            node.id for node in ast.walk(tree) if isinstance(node, ast.Name)
+        )
+    rule["_source"] = condition
+
+
+def condition_names(rule):
+    """
+    Return the names referenced by the rule's condition.
+
+    Callers evaluating one rule against many similar contexts can use this to
+    tell whether the result can differ between them at all.
+    """
+    _precompile_rule(rule)
+    return rule["_names"]
+
+
+def _condition_function(rule, globals_dict):
+    """
+    Return the rule's condition function bound to ``globals_dict``.
+
+    The function is cached on the rule per builtins mapping, since callers
+    build their globals dicts afresh but share the builtins they contain.
+    """
+    builtins = globals_dict.get("__builtins__")
+    cached = rule.get("_fn")
+    if cached is None or cached[0] is not builtins:
+        cached = (builtins, types.FunctionType(rule["_compiled"], globals_dict))
+        rule["_fn"] = cached
+    return cached[1]
+
+
+def evaluate_condition(rule, globals_dict, local_context):
+    """
+    Evaluate the rule's condition, using the precompiled form.
+
+    Conditions that only read literal ``data[...]`` entries are memoized on
+    the values of those entries, so an unchanged input skips eval entirely.
+
+    Args:
+        rule: Rule dict with a 'condition' expression.
+        globals_dict: Globals for eval (normally just restricted builtins).
+        local_context: Mapping of the names available to the expression.
+
+    Returns:
+        The value of the condition.
+    """
+    _precompile_rule(rule)
+    if "_const_result" in rule:
+        return rule["_const_result"]
+
+    key = _result_cache_key(
+        rule, local_context.get("data"), globals_dict.get("__builtins__")
+    )
+    if key is not None:
+        with _result_cache_lock:
+            if key in _result_cache:
+                _result_cache.move_to_end(key)
+                return _result_cache[key]
+
+    try:
+        args = [local_context[name] for name in rule["_params"]]
+    except KeyError:
+        # The function needs every free name up front, but a missing one may
+        # sit behind a short-circuit that never reads it, e.g.
+        # "file.get('type') == 'directory' and prev_file ...". eval() looks
+        # names up only as they are reached, raising NameError if they are.
+        result = eval(rule["_eval_code"], globals_dict, local_context)
+    else:
+        result = _condition_function(rule, globals_dict)(*args)
+
+    if key is not None:
+        with _result_cache_lock:
+            _result_cache[key] = result
+            if len(_result_cache) > _RESULT_CACHE_SIZE:
+                _result_cache.popitem(last=False)
+    return result
+
+
+def get_affected_files_code(rule):
+    """
+    Return the compiled code object for the rule's ``affected_files_expr``.
+
+    The expression is compiled on first use; the source is cached alongside
+    so that an expression changed in place is recompiled.
+    """
+    source = rule["affected_files_expr"]
+    cached = rule.get("_affected_code")
+    if cached is None or cached[0] is not source:
+        tree = ast.parse(source, mode="eval")
+        _validate_expression(tree)
+        code = compile(tree, f"<rule:{rule.get('name', 'Unnamed')}>", "eval")
+        cached = (source, code)
+        rule["_affected_code"] = cached
+    return cached[1]
+
 
 def evaluate_rule(rule, context):
     """
@@ -26,29 +408,20 @@ def evaluate_rule(rule, context):
     Returns:
       (triggered: bool, affected_files: list)
     """
+    # Layer an empty affected_files list (in case the condition uses it) over
+    # the provided context instead of copying it; eval() accepts any mapping.
+    return _evaluate_rule_in(rule, ChainMap({"affected_files": []}, context))
+
+
+def _evaluate_rule_in(rule, local_context):
+    """Evaluate a rule against a prepared local context (see evaluate_rule)."""
     condition = rule.get("condition")
     if not condition:
         return False, []
 
-    # Build a local context from the provided context.
-    # This context is available to the eval() call.
-    local_context = context.copy()
-    # Pre-populate an empty list for affected_files in case the condition uses it.
-    local_context["affected_files"] = []
-
-    # Define a set of safe built-in functions for use in rule expressions.
-    safe_builtins = {
-        "min": min,
-        "max": max,
-        "any": any,
-        "all": all,
-        "sum": sum,
-        "len": len,
-    }
-
     try:
         # Evaluate the condition with our safe builtins.
-        triggered = eval(condition, {"__builtins__": safe_builtins}, local_context)
+        triggered = evaluate_condition(rule, _EVAL_GLOBALS, local_context)
     except Exception as e:
         raise ValueError(f"Error evaluating rule '{rule.get('name', 'Unnamed')}': {e}")
 
@@ -57,9 +430,7 @@ def evaluate_rule(rule, context):
     if "affected_files_expr" in rule:
         try:
             affected_files = eval(
-                rule["affected_files_expr"],
-                {"__builtins__": safe_builtins},
-                local_context,
+                get_affected_files_code(rule), _EVAL_GLOBALS, local_context
             )
         except Exception as e:
             raise ValueError(
@@ -74,6 +445,16 @@ def evaluate_rule(rule, context):
     return triggered, affected_files
 
 
+def _evaluate_rules_inline(rules, context):
+    """Yield evaluate_rule results for each rule."""
+    # One overlay shared by all rules; only affected_files is reset per rule.
+    scratch = {}
+    local_context = ChainMap(scratch, context)
+    for rule in rules:
+        scratch["affected_files"] = []
+        yield _evaluate_rule_in(rule, local_context)
+
+
 def evaluate_rules(rules, context):
     """
     Evaluate a list of rules against the given context.
@@ -84,15 +465,15 @@ def evaluate_rules(rules, context):
       - severity: the rule-defined severity (if any)
       - affected_files: list of file paths that triggered the event
     """
-    triggered_events = []
-    for rule in rules:
-        triggered, affected_files = evaluate_rule(rule, context)
-        if triggered and affected_files:
-            event_record = {
-                "name": rule.get("name", "Unnamed Event"),
-                "event_type": rule.get("event_type"),
-                "severity": rule.get("severity"),
-                "affected_files": affected_files,
-            }
-            triggered_events.append(event_record)
-    return triggered_events
+    rules = list(rules)
+    results = _evaluate_rules_inline(rules, context)
+    return [
+        {
+            "name": rule.get("name", "Unnamed Event"),
+            "event_type": rule.get("event_type"),
+            "severity": rule.get("severity"),
+            "affected_files": affected_files,
+        }
+        for rule, (triggered, affected_files) in zip(rules, results)
+        if triggered and affected_files
+    ]
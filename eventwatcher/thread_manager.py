@@ -1,7 +1,8 @@
 """
 This module provides a ThreadManager class that manages worker threads.
 It is designed to work with threads (such as those created by thread_factory.py)
-that implement a cooperative stop mechanism via a stop() method.
+that implement a cooperative stop mechanism via a stop() method; registering a
+thread without one is an error.
 
 Features:
 - Register and unregister threads.
@@ -18,10 +19,9 @@ Note:
 import logging
 import threading
 
-# Configure logging for debug output
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s"
-)
+from eventwatcher.utils import Stoppable
+
+logger = logging.getLogger(__name__)
 
 
 class ThreadManager:
@@ -29,12 +29,13 @@ class ThreadManager:
     A class to manage worker threads.
 
     Attributes:
-        threads (list): A list to keep track of the registered threads.
+        threads (dict): The registered threads, keyed by ``id(thread)`` (the
+            ident is None until a thread starts). Insertion order is kept.
     """
 
     def __init__(self):
-        """Initialize the ThreadManager with an empty list of threads."""
-        self.threads = []
+        """Initialize the ThreadManager with an empty thread registry."""
+        self.threads = {}
 
     def register_thread(self, thread):
         """
@@ -44,12 +45,17 @@ class ThreadManager:
             thread (threading.Thread): The thread to register.
 
         Raises:
-            ValueError: If the thread is not an instance of threading.Thread.
+            ValueError: If the thread is not an instance of threading.Thread,
+                or has no stop() method (see utils.Stoppable).
         """
         if not isinstance(thread, threading.Thread):
             raise ValueError("Only threading.Thread instances can be registered.")
-        self.threads.append(thread)
-        logging.debug("Registered thread: %s", thread.name)
+        if not isinstance(thread, Stoppable) and not callable(
+            getattr(thread, "stop", None)
+        ):
+            raise ValueError(f"Thread {thread.name} does not have a stop() method.")
+        self.threads[id(thread)] = thread
+        logger.debug("Registered thread: %s", thread.name)
 
     def unregister_thread(self, thread):
         """
@@ -58,9 +64,8 @@ class ThreadManager:
         Args:
             thread (threading.Thread): The thread to unregister.
         """
-        if thread in self.threads:
-            self.threads.remove(thread)
-            logging.debug("Unregistered thread: %s", thread.name)
+        if self.threads.pop(id(thread), None) is not None:
+            logger.debug("Unregistered thread: %s", thread.name)
 
     def get_status(self, thread):
         """
@@ -91,19 +96,20 @@ class ThreadManager:
             dict: A dictionary where keys are thread names and values are status dictionaries.
                  All values are guaranteed to be JSON-serializable.
         """
-        return {str(thread.name): self.get_status(thread) for thread in self.threads}
+        return {
+            str(thread.name): self.get_status(thread)
+            for thread in self.threads.values()
+        }
 
     def stop_all(self):
         """
-        Stop all registered threads by calling their stop() method if available.
-        Threads that do not implement a stop() method will be skipped with a warning.
+        Stop all registered threads by calling their stop() method.
         """
-        for thread in self.threads:
-            if hasattr(thread, "stop") and callable(thread.stop):
-                logging.debug("Stopping thread: %s", thread.name)
-                thread.stop()
-            else:
-                logging.warning("Thread %s does not have a stop() method.", thread.name)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for thread in self.threads.values():
+            if debug:
+                logger.debug("Stopping thread: %s", thread.name)
+            thread.stop()
 
     def join_all(self, timeout=None):
         """
@@ -112,8 +118,10 @@ class ThreadManager:
         Args:
             timeout (float, optional): Timeout in seconds to wait for each thread.
         """
-        for thread in self.threads:
-            logging.debug("Joining thread: %s", thread.name)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for thread in self.threads.values():
+            if debug:
+                logger.debug("Joining thread: %s", thread.name)
             thread.join(timeout)
 
     def stop_and_join_all(self, timeout=None):
@@ -131,8 +139,10 @@ class ThreadManager:
         Remove threads that have finished running from the manager.
         """
         initial_count = len(self.threads)
-        self.threads = [thread for thread in self.threads if thread.is_alive()]
-        logging.debug(
+        self.threads = {
+            key: thread for key, thread in self.threads.items() if thread.is_alive()
+        }
+        logger.debug(
             "Cleared finished threads. %d removed, %d remaining.",
             initial_count - len(self.threads),
             len(self.threads),
@@ -10,15 +10,27 @@ Both worker threads run in an infinite loop until a stop signal is set.
 
 import logging
 import threading
+import time
 from queue import Empty
 
-# Configure logging for debug output
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s"
-)
+logger = logging.getLogger(__name__)
 
 
-class PeriodicWorker(threading.Thread):
+class Stoppable:
+    """
+    Mixin for threads that support cooperative cancellation via stop().
+
+    ThreadManager only accepts threads that implement stop().
+    """
+
+    def stop(self):
+        """
+        Signal the thread to stop.
+        """
+        raise NotImplementedError
+
+
+class PeriodicWorker(Stoppable, threading.Thread):
     """
     A thread that runs a worker function periodically every `interval` seconds.
     """
@@ -47,29 +59,45 @@ class PeriodicWorker(threading.Thread):
         """
         Run the worker function periodically until a stop signal is received.
         """
-        logging.debug("PeriodicWorker started with interval: %s seconds", self.interval)
+        logger.debug("PeriodicWorker started with interval: %s seconds", self.interval)
+        # Schedule against a monotonic deadline so the time spent in worker_fn
+        # doesn't push every later call back.
+        next_t = time.monotonic() + self.interval
         while not self.stop_event.is_set():
             try:
-                logging.debug("PeriodicWorker: Executing worker function.")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("PeriodicWorker: Executing worker function.")
                 self.worker_fn(*self.args, **self.kwargs)
             except Exception as e:
-                logging.exception("Exception in periodic worker function: %s", e)
-            # Wait for the specified interval, but exit early if stop_event is set.
-            if self.stop_event.wait(self.interval):
+                logger.exception("Exception in periodic worker function: %s", e)
+            # Wait until the next deadline, but exit early if stop_event is set.
+            delay = next_t - time.monotonic()
+            if delay > 0 and self.stop_event.wait(delay):
                 break
-        logging.debug("PeriodicWorker stopped.")
+            next_t += self.interval
+            now = time.monotonic()
+            if next_t < now:
+                # worker_fn overran; resync rather than firing a burst of
+                # catch-up calls.
+                next_t = now + self.interval
+        logger.debug("PeriodicWorker stopped.")
 
     def stop(self):
         """
         Signal the thread to stop.
         """
-        logging.debug("PeriodicWorker received stop signal.")
+        logger.debug("PeriodicWorker received stop signal.")
         self.stop_event.set()
 
 
-class QueueWorker(threading.Thread):
+class QueueWorker(Stoppable, threading.Thread):
     """
     A thread that waits for items on a queue and processes them using a worker function.
+
+    The worker blocks on the queue for up to ``poll_interval`` seconds at a
+    time and checks its stop event in between, so stop() takes effect within
+    one interval while the queue is idle. Nothing is put on the queue to stop
+    a worker, so workers sharing a queue never see each other's signals.
     """
 
     def __init__(self, queue, worker_fn, poll_interval=1.0, *args, **kwargs):
@@ -80,7 +108,8 @@ class QueueWorker(threading.Thread):
             queue (Queue): The queue to get items from.
             worker_fn (callable): The function to process items.
                 This function should expect the queue item as its first parameter.
-            poll_interval (float): Time in seconds to wait (timeout) for an item.
+            poll_interval (float): Longest time in seconds to block on the
+                queue before checking for a stop signal.
             *args: Additional positional arguments passed to worker_fn.
             **kwargs: Additional keyword arguments passed to worker_fn.
         """
@@ -95,33 +124,32 @@ class QueueWorker(threading.Thread):
 
     def run(self):
         """
-        Continuously poll the queue for new items and process them.
+        Process items from the queue until a stop signal is received.
         """
-        logging.debug(
-            "QueueWorker started with poll interval: %s seconds", self.poll_interval
-        )
+        logger.debug("QueueWorker started.")
+        # Checked before every get(), including the first, so a worker
+        # stopped before it was started exits straight away.
         while not self.stop_event.is_set():
             try:
-                # Attempt to retrieve an item from the queue; wait for poll_interval seconds.
                 item = self.queue.get(timeout=self.poll_interval)
-                logging.debug("QueueWorker: Processing item from queue: %s", item)
-                try:
-                    self.worker_fn(item, *self.args, **self.kwargs)
-                except Exception as e:
-                    logging.exception("Exception in processing item %s: %s", item, e)
-                finally:
-                    # Mark the task as done.
-                    self.queue.task_done()
             except Empty:
-                # No item received within the poll interval; check stop_event and continue.
                 continue
-        logging.debug("QueueWorker stopped.")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("QueueWorker: Processing item from queue: %s", item)
+            try:
+                self.worker_fn(item, *self.args, **self.kwargs)
+            except Exception as e:
+                logger.exception("Exception in processing item %s: %s", item, e)
+            finally:
+                # Mark the task as done.
+                self.queue.task_done()
+        logger.debug("QueueWorker stopped.")
 
     def stop(self):
         """
         Signal the thread to stop.
         """
-        logging.debug("QueueWorker received stop signal.")
+        logger.debug("QueueWorker received stop signal.")
         self.stop_event.set()
 
 
@@ -140,7 +168,7 @@ def spawn_periodic_worker(worker_fn, interval, *args, **kwargs):
     """
     worker = PeriodicWorker(worker_fn, interval, *args, **kwargs)
     worker.start()
-    logging.debug("spawn_periodic_worker: Started a new PeriodicWorker thread.")
+    logger.debug("spawn_periodic_worker: Started a new PeriodicWorker thread.")
     return worker
 
 
@@ -152,7 +180,8 @@ def spawn_queue_worker(queue, worker_fn, poll_interval=1.0, *args, **kwargs):
         queue (Queue): Queue instance to monitor.
         worker_fn (callable): Function to process queue items.
             The function should accept the queue item as its first parameter.
-        poll_interval (float): Time interval to poll the queue for items.
+        poll_interval (float): Longest time to block on the queue before
+            checking for a stop signal.
         *args: Positional arguments for worker_fn.
         **kwargs: Keyword arguments for worker_fn.
 
@@ -161,5 +190,5 @@ def spawn_queue_worker(queue, worker_fn, poll_interval=1.0, *args, **kwargs):
     """
     worker = QueueWorker(queue, worker_fn, poll_interval, *args, **kwargs)
     worker.start()
-    logging.debug("spawn_queue_worker: Started a new QueueWorker thread.")
+    logger.debug("spawn_queue_worker: Started a new QueueWorker thread.")
     return worker
@@ -44,4 +44,4 @@ print("All threads stopped.")
 
 # Clear finished threads from the manager.
 manager.clear_finished()
-print("Final thread registry:", manager.threads)
+print("Final thread registry:", list(manager.threads.values()))
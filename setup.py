@@ -15,5 +15,10 @@ setup(
         "tabulate",
         "psutil",
     ],
+    extras_require={
+        "blake3": ["blake3"],
+        "orjson": ["orjson"],
+        "test": ["pytest", "pytest-xdist"],
+    },
     entry_points={"console_scripts": ["eventwatcher=eventwatcher.cli:main"]},
 )
@@ -29,3 +29,34 @@ def test_db_init_and_insert(temp_db):
     samples = cur.fetchall()
     assert len(samples) == 1
     conn.close()
+
+
+def test_insert_events_is_one_transaction(temp_db):
+    db.insert_events(
+        temp_db,
+        "TestGroup",
+        1600000000,
+        [
+            ("Rule A", "created", "INFO", ["/path/a"]),
+            ("Rule B", "removed", "WARNING", ["/path/b"]),
+        ],
+    )
+    conn = sqlite3.connect(temp_db)
+    rows = conn.execute(
+        "SELECT event, event_type, affected_files FROM events ORDER BY id"
+    ).fetchall()
+    assert rows == [
+        ("Rule A", "created", json.dumps(["/path/a"])),
+        ("Rule B", "removed", json.dumps(["/path/b"])),
+    ]
+
+    # A failing row rolls back the whole batch.
+    with pytest.raises(sqlite3.IntegrityError):
+        db.insert_events(
+            temp_db,
+            "TestGroup",
+            1600000001,
+            [("Rule C", "created", None, []), (None, "created", None, [])],
+        )
+    assert conn.execute("SELECT COUNT(*) FROM events").fetchone() == (2,)
+    conn.close()
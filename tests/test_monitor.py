@@ -11,20 +11,41 @@ This test suite covers:
 
 import os
 import shutil
+import threading
 import time
 from pathlib import Path
 
 import pytest
 
 from eventwatcher import db
+from eventwatcher import monitor as monitor_module
 from eventwatcher.monitor import (Monitor, collect_sample, compare_samples,
                                   get_event_type)
+from eventwatcher.thread_manager import ThreadManager
 
 
-@pytest.fixture
-def temp_dir(tmp_path):
-    """Fixture to create a temporary directory structure."""
-    test_dir = tmp_path / "test_dir"
+def wait_for(predicate, timeout=0.2, step=0.01):
+    """Poll ``predicate`` until it returns true or ``timeout`` seconds elapse."""
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(step)
+    return predicate()
+
+
+def tree_state(root):
+    """Return the (mtime, size) of every entry under ``root``, keyed by path."""
+    return {
+        path: (path.stat().st_mtime_ns, path.stat().st_size)
+        for path in [root, *root.rglob("*")]
+    }
+
+
+@pytest.fixture(scope="module")
+def template_dir(tmp_path_factory):
+    """Fixture to build the directory structure copied into each test."""
+    # mktemp numbers its directories under a per-worker base directory, so
+    # this is safe to run under pytest-xdist.
+    test_dir = tmp_path_factory.mktemp("tpl", numbered=True) / "test_dir"
     test_dir.mkdir()
 
     # Create some files
@@ -36,16 +57,36 @@ def temp_dir(tmp_path):
     subdir.mkdir()
     (subdir / "subfile1.txt").write_text("Subdir content 1")
 
-    yield test_dir
+    return test_dir
+
+
+@pytest.fixture(scope="module")
+def reference_db(tmp_path_factory):
+    """Fixture to create an initialized database copied into each test."""
+    db_path = tmp_path_factory.mktemp("db") / "reference.db"
+    db.init_db(str(db_path))
+    return db_path
+
+
+@pytest.fixture
+def temp_dir(template_dir, tmp_path):
+    """Fixture to create a temporary directory structure."""
+    # Each test gets its own copy of the template, so changes don't leak.
     # Cleanup happens automatically via tmp_path
+    return Path(shutil.copytree(template_dir, tmp_path / "test_dir"))
 
 
 @pytest.fixture
 def watch_group(temp_dir):
     """Fixture to create a watch group configuration."""
+    return make_watch_group(temp_dir)
+
+
+def make_watch_group(root):
+    """Return the test watch group configuration for the tree at ``root``."""
     return {
         "name": "TestGroup",
-        "watch_items": [str(temp_dir)],
+        "watch_items": [str(root)],
         "sample_rate": 60,
         "max_samples": 2,
         "pattern": "ERROR",
@@ -69,17 +110,21 @@ def watch_group(temp_dir):
 
 
 @pytest.fixture
-def monitor_instance(temp_dir, watch_group, tmp_path):
-    """Fixture to create a Monitor instance."""
-    db_path = str(tmp_path / "test.db")
-    log_dir = str(tmp_path / "logs")
-    os.makedirs(log_dir, exist_ok=True)
+def log_dir(tmp_path):
+    """Fixture to create a log directory."""
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    return str(log_dir)
 
-    # Initialize database
-    db.init_db(db_path)
 
-    monitor = Monitor(watch_group, db_path, log_dir, log_level="DEBUG")
-    return monitor
+@pytest.fixture
+def monitor_instance(temp_dir, watch_group, log_dir):
+    """Fixture to create a Monitor instance backed by an in-memory database."""
+    monitor = Monitor(watch_group, ":memory:", log_dir, log_level="DEBUG")
+    # The in-memory database lives as long as the monitor's connection.
+    db.init_db(monitor.db_path, conn=monitor.get_connection())
+    yield monitor
+    monitor.close()
 
 
 def test_compare_samples_new_file():
@@ -161,10 +206,11 @@ def test_compare_samples_directory_changes():
     assert not diff['new']
     assert not diff['removed']
     assert "/path/dir" in diff['modified']
-    assert diff['modified']["/path/dir"]["file_count"]["old"] == 3
-    assert diff['modified']["/path/dir"]["file_count"]["new"] == 5
-    assert diff['modified']["/path/dir"]["total_size"]["old"] == 800
-    assert diff['modified']["/path/dir]["total_size"]["new"] == 1000
+    changes = diff['modified']["/path/dir"]
+    assert changes["file_count"]["old"] == 3
+    assert changes["file_count"]["new"] == 5
+    assert changes["total_size"]["old"] == 800
+    assert changes["total_size"]["new"] == 1000
 
 
 def test_get_event_type_file_changes():
@@ -181,8 +227,8 @@ def test_get_event_type_file_changes():
 def test_get_event_type_directory_changes():
     """Test event type detection for directory changes."""
     changes = {
-        "file_count": {"old": 3, "new": 5},
-        "total_size": {"old": 800, "new": 1000}
+        "files_count": {"old": 3, "new": 5},
+        "size": {"old": 800, "new": 1000}
     }
     event_type = get_event_type(changes, "directory")
     assert "files_changed" in event_type
@@ -214,58 +260,179 @@ def test_collect_sample_structure(temp_dir, watch_group):
     assert sample[subdir]["file_count"] == 1  # subfile1.txt
 
 
-@pytest.mark.parametrize("change_type", [
-    "file_content",
-    "add_file",
-    "remove_file",
-    "add_subdir",
-    "pattern_change"
-])
-def test_monitor_change_detection(monitor_instance, temp_dir, change_type):
-    """Test various types of changes are properly detected."""
-    # First run to establish baseline
-    monitor_instance.run_once()
+def test_process_entry_parallel_matches_serial(temp_dir, monkeypatch):
+    """Test that walking subdirectories in parallel collects the same sample."""
+    for i in range(6):
+        (temp_dir / f"extra_{i}").mkdir()
+        (temp_dir / f"extra_{i}" / "file.txt").write_text(f"Extra {i}")
 
-    # Make the specified change
-    if change_type == "file_content":
-        (temp_dir / "file1.txt").write_text("Modified content")
-    elif change_type == "add_file":
-        (temp_dir / "newfile.txt").write_text("New content")
-    elif change_type == "remove_file":
-        (temp_dir / "file2.txt").unlink()
-    elif change_type == "add_subdir":
-        new_subdir = temp_dir / "new_subdir"
-        new_subdir.mkdir()
-        (new_subdir / "subfile.txt").write_text("Content")
-    elif change_type == "pattern_change":
-        (temp_dir / "file1.txt").write_text("An ERROR occurred")
-
-    # Allow filesystem events to propagate
-    time.sleep(1)
+    serial = {}
+    monkeypatch.setattr(monitor_module, "_PARALLEL_SUBDIR_THRESHOLD", 100)
+    monitor_module.process_entry(str(temp_dir), serial, max_depth=3)
+
+    parallel = {}
+    monkeypatch.setattr(monitor_module, "_PARALLEL_SUBDIR_THRESHOLD", 4)
+    monkeypatch.setattr(monitor_module, "_SCAN_WORKERS", 4)
+    monitor_module.process_entry(str(temp_dir), parallel, max_depth=3)
+
+    assert parallel == serial
+    assert len(parallel) == 1 + 3 + 1 + 12
 
-    # Second run to detect changes
-    sample, events = monitor_instance.run_once()
+
+def test_file_hashes_are_reused_until_file_changes(temp_dir, monkeypatch):
+    """Test that unchanged files are not re-hashed between samples."""
+    path = str(temp_dir / "file1.txt")
+    cache = monitor_module.FileHashCache()
+    hashed = []
+    hash_file = monitor_module._hash_file
+    monkeypatch.setattr(
+        monitor_module,
+        "_hash_file",
+        lambda *args: hashed.append(args[0]) or hash_file(*args),
+    )
+
+    first = monitor_module._file_hashes_for_stat(path, os.stat(path), hash_cache=cache)
+    cache.rotate()
+    second = monitor_module._file_hashes_for_stat(path, os.stat(path), hash_cache=cache)
+    assert second == first
+    assert hashed == [path]
+
+    (temp_dir / "file1.txt").write_text("Modified content")
+    cache.rotate()
+    third = monitor_module._file_hashes_for_stat(path, os.stat(path), hash_cache=cache)
+    assert hashed == [path, path]
+    assert third != first
+    assert third == monitor_module.compute_file_hashes(path)
+
+    # Entries not used during a sample are dropped at the next rotation.
+    hashed.clear()
+    cache.rotate()
+    cache.rotate()
+    monitor_module._file_hashes_for_stat(path, os.stat(path), hash_cache=cache)
+    assert hashed == [path]
+
+
+def test_check_file_pattern(tmp_path):
+    """Test pattern detection, including empty and non-UTF-8 files."""
+    path = tmp_path / "app.log"
+    path.write_bytes(b"")
+    assert monitor_module.check_file_pattern(str(path), "ERROR") is False
+    path.write_bytes(b"\xff\xfe ok\n[ERROR] d\xc3\xa9j\xc3\xa0 vu\n")
+    assert monitor_module.check_file_pattern(str(path), "ERROR") is True
+    assert monitor_module.check_file_pattern(str(path), "déjà") is True
+    assert monitor_module.check_file_pattern(str(path), "FATAL") is False
+    assert monitor_module.check_file_pattern(str(tmp_path / "missing"), "x") is None
+
+
+def test_check_file_pattern_across_chunks(tmp_path, monkeypatch):
+    """Test that a match spanning a read chunk boundary is found."""
+    monkeypatch.setattr(monitor_module, "_HASH_CHUNK_SIZE", 8)
+    path = tmp_path / "app.log"
+    path.write_bytes(b"abcdefERROR and more text after it")
+    assert monitor_module.check_file_pattern(str(path), "ERROR") is True
+    assert monitor_module.check_file_pattern(str(path), "after it") is True
+    assert monitor_module.check_file_pattern(str(path), "FATAL") is False
+
+
+def test_monitor_stop_interrupts_run(monitor_instance):
+    """Test that stop() wakes the run loop instead of waiting out sample_rate."""
+    thread = threading.Thread(target=monitor_instance.run)
+    thread.start()
+    monitor_instance.stop()
+    thread.join(timeout=1)
+    assert not thread.is_alive()
+
+
+def test_monitor_thread_can_be_managed(monitor_instance):
+    """Test that ThreadManager can register and stop a MonitorThread."""
+    manager = ThreadManager()
+    thread = monitor_module.MonitorThread(monitor_instance)
+    manager.register_thread(thread)
+    thread.start()
+    assert manager.get_status(thread)["name"] == "Monitor-TestGroup"
+
+    manager.stop_and_join_all(timeout=1)
+    assert not thread.is_alive()
+
+
+def _add_subdir(root):
+    new_subdir = root / "new_subdir"
+    new_subdir.mkdir()
+    (new_subdir / "subfile.txt").write_text("Content")
+
+
+# Changes made one after another to the same tree, in order, and the event
+# types any of which detects each. Changes accumulate, so each expected event
+# type is unique to its change.
+CHANGE_SCENARIOS = {
+    "file_content": (
+        lambda root: (root / "file1.txt").write_text("Modified content"),
+        ("content",),
+    ),
+    "add_file": (
+        lambda root: (root / "newfile.txt").write_text("New content"),
+        ("created",),
+    ),
+    "remove_file": (lambda root: (root / "file2.txt").unlink(), ("removed",)),
+    "add_subdir": (_add_subdir, ("files_changed", "subdirs_changed")),
+    "pattern_change": (
+        lambda root: (root / "file1.txt").write_text("An ERROR occurred"),
+        ("pattern_found",),
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def change_events(template_dir, reference_db, tmp_path_factory):
+    """
+    Fixture to detect each change in CHANGE_SCENARIOS, keyed by change type.
+
+    The baseline is scanned once, into a file-backed database. Each change is
+    then detected by a monitor on a fresh copy of the baseline database, so
+    it is compared against the baseline rather than the previous change.
+    """
+    root = tmp_path_factory.mktemp("changes")
+    tree = Path(shutil.copytree(template_dir, root / "test_dir"))
+    log_dir = root / "logs"
+    log_dir.mkdir()
+    group = make_watch_group(tree)
+
+    baseline_db = root / "baseline.db"
+    shutil.copy(reference_db, baseline_db)
+    baseline_monitor = Monitor(group, str(baseline_db), str(log_dir), log_level="DEBUG")
+    baseline_monitor.run_once()
+    baseline_monitor.close()
+
+    events = {}
+    for change_type, (make_change, _) in CHANGE_SCENARIOS.items():
+        db_path = root / f"{change_type}.db"
+        shutil.copy(baseline_db, db_path)
+        monitor = Monitor(group, str(db_path), str(log_dir), log_level="DEBUG")
+
+        before = tree_state(tree)
+        make_change(tree)
+        # Wait until the change is visible on the filesystem
+        assert wait_for(lambda: tree_state(tree) != before)
+
+        _, events[change_type] = monitor.run_once()
+        monitor.close()
+    return events
+
+
+@pytest.mark.parametrize("change_type", list(CHANGE_SCENARIOS))
+def test_monitor_change_detection(change_events, change_type):
+    """Test various types of changes are properly detected."""
+    events = change_events[change_type]
+    _, expected = CHANGE_SCENARIOS[change_type]
 
     # Verify appropriate events were generated
     assert events, f"No events generated for {change_type}"
+    assert any(
+        name in e["event_type"].lower() for e in events for name in expected
+    ), f"Expected event missing for {change_type}"
+
 
-    if change_type == "file_content":
-        assert any("content" in e["event_type"].lower() for e in events)
-    elif change_type == "add_file":
-        assert any("created" in e["event_type"].lower() for e in events)
-    elif change_type == "remove_file":
-        assert any("removed" in e["event_type"].lower() for e in events)
-    elif change_type == "add_subdir":
-        assert any(
-            "files_changed" in e["event_type"].lower() or
-            "subdirs_changed" in e["event_type"].lower()
-            for e in events
-        )
-    elif change_type == "pattern_change":
-        assert any("pattern_found" in e["event_type"].lower() for e in events)
-
-
-def test_monitor_multiple_changes(monitor_instance, temp_dir):
+def test_monitor_multiple_changes(monitor_instance, temp_dir, caplog):
     """Test handling of multiple simultaneous changes."""
     # First run to establish baseline
     monitor_instance.run_once()
@@ -275,7 +442,10 @@ def test_monitor_multiple_changes(monitor_instance, temp_dir):
     (temp_dir / "newfile.txt").write_text("New content")
     (temp_dir / "file2.txt").unlink()
 
-    time.sleep(1)
+    assert wait_for(
+        lambda: (temp_dir / "newfile.txt").exists()
+        and not (temp_dir / "file2.txt").exists()
+    )
 
     # Second run to detect changes
     sample, events = monitor_instance.run_once()
@@ -287,10 +457,13 @@ def test_monitor_multiple_changes(monitor_instance, temp_dir):
     assert any("removed" in et.lower() for et in event_types)
 
     # Verify only changed files triggered events
-    affected_files = [e["affected_file"] for e in events]
-    assert str(temp_dir / "file1.txt") in affected_files
-    assert str(temp_dir / "newfile.txt") in affected_files
-    assert str(temp_dir / "file2.txt") in affected_files
+    affected_files = {e["affected_file"] for e in events}
+    changed = {str(temp_dir / name) for name in ("file1.txt", "newfile.txt", "file2.txt")}
+    assert changed <= affected_files
+
+    # DirectoryGrowth only reads prev_file for directories, so evaluating it
+    # for a removed file, whose context has no prev_file, is not an error.
+    assert "Error evaluating rule" not in caplog.text
 
 
 def test_directory_explosion_depth(monitor_instance, temp_dir):
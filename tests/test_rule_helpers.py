@@ -1,4 +1,6 @@
-from eventwatcher.rule_helpers import aggregate_metric
+from eventwatcher import db, rule_helpers
+from eventwatcher.rule_helpers import (aggregate_metric, get_previous_metric,
+                                       make_indexed_aggregate)
 
 
 def test_aggregate_metric_no_match():
@@ -6,3 +8,73 @@ def test_aggregate_metric_no_match():
     sample_data = {"/path/to/file.txt": {"size": 123, "last_modified": 1600000000}}
     result = aggregate_metric(sample_data, "*.nomatch", "last_modified", min)
     assert result == 0
+    for func in (max, sum, lambda values: values[0]):
+        assert aggregate_metric(sample_data, "*.nomatch", "size", func) == 0
+
+
+def test_aggregate_metric_glob_patterns():
+    sample_data = {
+        "/var/log/app.log": {"size": 10},
+        "/var/log/app.log.1": {"size": 20},
+        "/var/log/sub/other.log": {"size": 40},
+        "/etc/app.conf": {"size": 80},
+        "/var/log/dir": {"type": "directory"},
+    }
+    # Plain prefix patterns take the startswith fast path.
+    assert aggregate_metric(sample_data, "/var/log/*", "size", sum) == 70
+    # Full globs go through the compiled regex.
+    assert aggregate_metric(sample_data, "/var/log/*.log", "size", sum) == 50
+    assert aggregate_metric(sample_data, "/var/log/app.log.[0-9]", "size", max) == 20
+
+
+def test_glob_matcher_cache_is_bounded():
+    # Patterns built at run time must not grow the cache without limit.
+    for i in range(rule_helpers._GLOB_CACHE_SIZE + 10):
+        assert rule_helpers.match_glob(f"/var/log/{i}.log", f"/var/log/{i}.*")
+    info = rule_helpers._glob_matcher.cache_info()
+    assert info.currsize <= rule_helpers._GLOB_CACHE_SIZE
+
+
+def test_indexed_aggregate_matches_aggregate_metric():
+    sample_data = {
+        "/var/log/app.log": {"size": 10},
+        "/var/log/app.log.1": {"size": 20},
+        "/var/logs/x.log": {"size": 40},
+        "/etc/app.conf": {"size": 80},
+    }
+    aggregate = make_indexed_aggregate(sample_data)
+    for pattern in ("/var/log/*", "/var/log*", "*.log", "/etc/app.conf", "/nope/*"):
+        assert aggregate(sample_data, pattern, "size", sum) == aggregate_metric(
+            sample_data, pattern, "size", sum
+        )
+
+    calls = []
+
+    def counting_sum(values):
+        calls.append(values)
+        return sum(values)
+
+    assert aggregate(sample_data, "/var/log/*", "size", counting_sum) == 30
+    assert aggregate(sample_data, "/var/log/*", "size", counting_sum) == 30
+    assert len(calls) == 1
+
+
+def test_get_previous_metric_patterns(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    db.init_db(db_path)
+    for epoch, path, size in [
+        (1, "/var/log/app.log", 10),
+        (2, "/var/log/app.log", 20),
+        (3, "/var/log/other_app.log", 30),
+        (4, "/etc/app.conf", 40),
+    ]:
+        db.insert_sample_record(
+            db_path, "TestGroup", epoch, path, {"type": "file", "size": size}
+        )
+
+    assert get_previous_metric(db_path, "TestGroup", "/var/log/app.log", "size") == 20
+    assert get_previous_metric(db_path, "TestGroup", "/var/log/*", "size") == 30
+    assert get_previous_metric(db_path, "TestGroup", "*.conf", "size") == 40
+    assert get_previous_metric(db_path, "TestGroup", "/var/log/other_%", "size") == 30
+    assert get_previous_metric(db_path, "TestGroup", "/var/log/*", "size", "ASC") == 10
+    assert get_previous_metric(db_path, "TestGroup", "/tmp/*", "size") is None
@@ -0,0 +1,171 @@
+import pytest
+
+from eventwatcher import rule_helpers
+from eventwatcher import rules as rule_module
+from eventwatcher.rules import evaluate_rule, evaluate_rules
+
+
+@pytest.fixture
+def context():
+    return {
+        "data": {
+            "/path/a.log": {"size": 100, "last_modified": 1600000000},
+            "/path/b.log": {"size": 300, "last_modified": 1600000100},
+        },
+        "now": 1600000200,
+    }
+
+
+def test_evaluate_rule_compiles_once(context):
+    rule = {
+        "name": "Big",
+        "condition": "data['/path/b.log']['size'] > 200",
+        "affected_files_expr": "['/path/b.log']",
+    }
+    assert evaluate_rule(rule, context) == (True, ["/path/b.log"])
+    code = rule["_compiled"]
+    evaluate_rule(rule, context)
+    assert rule["_compiled"] is code
+
+    # Changing the expression in place recompiles it.
+    rule["condition"] = "data['/path/b.log']['size'] > 500"
+    assert evaluate_rule(rule, context) == (False, ["/path/b.log"])
+
+
+def test_evaluate_rule_uses_the_safe_builtins(context):
+    rule = {"name": "Round", "condition": "round(abs(-1.6)) == 2 and int('3') == 3"}
+    assert evaluate_rule(rule, context)[0] is True
+
+
+def test_evaluate_rule_error_raises_value_error(context):
+    with pytest.raises(ValueError):
+        evaluate_rule({"name": "Broken", "condition": "1 +"}, context)
+
+
+@pytest.mark.parametrize(
+    "condition, expected",
+    [
+        ("True", True),
+        ("1 == 1 and not False", True),
+        ("False and data['missing']", False),
+        ("True or data['missing']", True),
+        ("(60 * 60) > 3000", True),
+    ],
+)
+def test_constant_conditions_skip_eval(context, condition, expected):
+    rule = {"name": "Const", "condition": condition}
+    triggered, _ = evaluate_rule(rule, context)
+    assert triggered == expected
+    if "*" not in condition:
+        assert rule["_const_result"] == expected
+        assert rule["_compiled"] is None
+
+
+def test_partially_constant_condition(context):
+    rule = {"name": "Partial", "condition": "True and len(data) > 1"}
+    assert evaluate_rule(rule, context)[0] is True
+    assert "_const_result" not in rule
+
+
+def test_evaluate_rules_reports_triggered(context):
+    rules = [
+        {"name": "Always", "condition": "True", "severity": "INFO"},
+        {"name": "Never", "condition": "False"},
+    ]
+    events = evaluate_rules(rules, context)
+    assert [e["name"] for e in events] == ["Always"]
+    assert sorted(events[0]["affected_files"]) == sorted(context["data"])
+
+
+def test_condition_results_are_memoized_on_read_set(context):
+    rule = {"name": "Size", "condition": "data['/path/a.log']['size'] > 50"}
+    assert rule_module._precompile_rule(rule) is None
+    assert rule["_read_set"] == ("/path/a.log",)
+    assert evaluate_rule(rule, context)[0] is True
+
+    builtins = rule_module._EVAL_GLOBALS["__builtins__"]
+    key = rule_module._result_cache_key(rule, context["data"], builtins)
+    assert key in rule_module._result_cache
+
+    # Results are not shared between evaluations with different builtins.
+    no_builtins = {"__builtins__": {}}
+    rule_module.evaluate_condition(rule, no_builtins, context)
+    assert rule_module._result_cache_key(rule, context["data"], {}) != key
+    abs_rule = {"name": "Abs", "condition": "abs(data['/path/a.log']['size']) > 1"}
+    with_abs = {"__builtins__": {"abs": abs}}
+    assert rule_module.evaluate_condition(abs_rule, with_abs, context)
+    with pytest.raises(NameError):
+        rule_module.evaluate_condition(abs_rule, no_builtins, context)
+
+    # A change to an entry the condition reads produces a new key.
+    context["data"]["/path/a.log"]["size"] = 10
+    assert evaluate_rule(rule, context)[0] is False
+
+    # Conditions depending on other context names are never memoized.
+    rule = {"name": "Age", "condition": "now - data['/path/a.log']['last_modified'] > 0"}
+    rule_module._precompile_rule(rule)
+    assert rule["_read_set"] is None
+
+
+def test_condition_names():
+    rule = {"condition": "file.get('size', 0) > aggregate(data, '*', 'size', max)"}
+    assert rule_module.condition_names(rule) == {"file", "aggregate", "data", "max"}
+    assert rule_module.condition_names({"condition": "1 < 2"}) == frozenset()
+
+
+def test_affected_files_expr_can_match_globs(context):
+    rule = {
+        "name": "Logs",
+        "condition": "True",
+        "affected_files_expr": "[f for f in data if match(f, '*/a.*')]",
+    }
+    assert evaluate_rule(rule, context) == (True, ["/path/a.log"])
+
+    rule = {
+        "name": "Sizes",
+        "condition": "aggregate(data, '*.log', 'size', sum) > 0",
+        "affected_files_expr": "[f for f in data if match(f, pattern='*/b.*')]",
+    }
+    context = dict(context, aggregate=rule_helpers.aggregate_metric)
+    assert evaluate_rule(rule, context) == (True, ["/path/b.log"])
+
+
+def test_condition_is_compiled_to_a_function_of_its_free_names(context):
+    rule = {
+        "name": "Recent",
+        "condition": "any(now - e['last_modified'] < 150 for e in data.values())",
+    }
+    assert evaluate_rule(rule, context)[0] is True
+    assert rule["_params"] == ("data", "now")
+
+    with pytest.raises(ValueError, match="missing"):
+        evaluate_rule({"name": "Missing", "condition": "missing > 1"}, context)
+
+
+def test_missing_name_behind_short_circuit_is_not_looked_up(context):
+    rule = {
+        "name": "Guarded",
+        "condition": "len(data) > 5 and missing > 1",
+        "affected_files_expr": "[]",
+    }
+    assert evaluate_rule(rule, context) == (False, [])
+    with pytest.raises(ValueError, match="missing"):
+        evaluate_rule(dict(rule, condition="len(data) > 1 and missing > 1"), context)
+
+
+@pytest.mark.parametrize(
+    "condition",
+    [
+        "().__class__.__bases__",
+        "__import__('os')",
+        "data.__class__ is dict",
+        # Walks from a generator's frame to the globals of rules.py.
+        "[*(g := (g.gi_frame.f_back.f_back.f_globals['os'].getpid()"
+        " for _ in [1]))][0] > 0",
+        "[f() for f in data.values()]",
+        "(lambda: 1)() == 1",
+    ],
+)
+def test_dunder_access_is_rejected(context, condition):
+    with pytest.raises(ValueError, match="not allowed"):
+        evaluate_rule({"name": "Escape", "condition": condition}, context)
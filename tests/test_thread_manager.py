@@ -2,11 +2,12 @@
 Unit tests for the ThreadManager class in thread_manager.py.
 """
 
+import threading
 import time
 import unittest
 
 from eventwatcher.thread_manager import ThreadManager
-from eventwatcher.utils import spawn_periodic_worker
+from eventwatcher.utils import PeriodicWorker, spawn_periodic_worker
 
 
 class DummyWorker:
@@ -20,7 +21,7 @@ class DummyWorker:
     def __call__(self):
         self.counter += 1
         # Sleep briefly to simulate work
-        time.sleep(0.1)
+        time.sleep(0.005)
 
 
 class TestThreadManager(unittest.TestCase):
@@ -30,7 +31,7 @@ class TestThreadManager(unittest.TestCase):
         """
         manager = ThreadManager()
         dummy = DummyWorker()
-        worker = spawn_periodic_worker(dummy, 0.5)
+        worker = spawn_periodic_worker(dummy, 0.02)
         manager.register_thread(worker)
 
         # Check status immediately after registration.
@@ -57,14 +58,14 @@ class TestThreadManager(unittest.TestCase):
         dummy1 = DummyWorker()
         dummy2 = DummyWorker()
 
-        worker1 = spawn_periodic_worker(dummy1, 0.5)
-        worker2 = spawn_periodic_worker(dummy2, 0.5)
+        worker1 = spawn_periodic_worker(dummy1, 0.02)
+        worker2 = spawn_periodic_worker(dummy2, 0.02)
 
         manager.register_thread(worker1)
         manager.register_thread(worker2)
 
         # Allow the threads to run for a short time.
-        time.sleep(1)
+        time.sleep(0.1)
         statuses_before = manager.get_all_statuses()
         self.assertTrue(statuses_before[worker1.name]["is_alive"])
         self.assertTrue(statuses_before[worker2.name]["is_alive"])
@@ -80,7 +81,7 @@ class TestThreadManager(unittest.TestCase):
         """
         manager = ThreadManager()
         dummy = DummyWorker()
-        worker = spawn_periodic_worker(dummy, 0.5)
+        worker = spawn_periodic_worker(dummy, 0.02)
         manager.register_thread(worker)
 
         # Stop and join the worker.
@@ -89,6 +90,34 @@ class TestThreadManager(unittest.TestCase):
         manager.clear_finished()
         self.assertEqual(len(manager.threads), 0, "Finished threads should be cleared.")
 
+    def test_unregister_thread(self):
+        """
+        Test that a registered thread can be unregistered, even before it starts.
+        """
+        manager = ThreadManager()
+        worker = spawn_periodic_worker(DummyWorker(), 0.02)
+        idle = PeriodicWorker(DummyWorker(), 0.02)
+        manager.register_thread(worker)
+        manager.register_thread(idle)
+        self.assertEqual(list(manager.threads.values()), [worker, idle])
+
+        manager.unregister_thread(idle)
+        manager.unregister_thread(idle)
+        self.assertEqual(list(manager.threads.values()), [worker])
+
+        manager.stop_and_join_all(timeout=1)
+        manager.unregister_thread(worker)
+        self.assertEqual(len(manager.threads), 0)
+
+    def test_register_thread_requires_stop(self):
+        """
+        Test that threads without a stop() method are rejected at registration.
+        """
+        manager = ThreadManager()
+        with self.assertRaises(ValueError):
+            manager.register_thread(threading.Thread(target=lambda: None))
+        self.assertEqual(len(manager.threads), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
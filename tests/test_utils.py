@@ -2,11 +2,12 @@
 Unit tests for the utils module.
 """
 
+import threading
 import time
 import unittest
 from queue import Queue
 
-from eventwatcher.utils import spawn_periodic_worker, spawn_queue_worker
+from eventwatcher.utils import QueueWorker, spawn_periodic_worker, spawn_queue_worker
 
 
 class TestThreadFactory(unittest.TestCase):
@@ -19,14 +20,14 @@ class TestThreadFactory(unittest.TestCase):
         def worker_fn():
             call_counter[0] += 1
 
-        # Spawn a periodic worker with a 0.5-second interval.
-        worker = spawn_periodic_worker(worker_fn, 0.5)
-        # Allow the worker to run for approximately 2 seconds.
-        time.sleep(2)
+        # Spawn a periodic worker with a 0.05-second interval.
+        worker = spawn_periodic_worker(worker_fn, 0.05)
+        # Allow the worker to run for approximately 0.25 seconds.
+        time.sleep(0.25)
         # Stop the worker and wait for it to finish.
         worker.stop()
         worker.join(timeout=1)
-        # Expect at least 3 executions in 2 seconds.
+        # Expect at least 3 executions in 0.25 seconds.
         self.assertGreaterEqual(
             call_counter[0], 3, "Periodic worker did not execute enough times"
         )
@@ -57,6 +58,97 @@ class TestThreadFactory(unittest.TestCase):
             "Queue worker did not process items correctly",
         )
 
+    def test_queue_workers_sharing_a_queue_stop_independently(self):
+        """
+        Test that stopping one of several workers on a queue leaves the others running.
+        """
+        processed_items = []
+        q = Queue()
+        worker1 = spawn_queue_worker(q, processed_items.append, poll_interval=0.01)
+        worker2 = spawn_queue_worker(q, processed_items.append, poll_interval=0.01)
+
+        worker1.stop()
+        worker1.join(timeout=1)
+        self.assertFalse(worker1.is_alive())
+        self.assertTrue(worker2.is_alive())
+
+        q.put("item")
+        q.join()
+        self.assertEqual(processed_items, ["item"])
+
+        worker2.stop()
+        worker2.join(timeout=1)
+        self.assertFalse(worker2.is_alive())
+
+    def test_stopping_an_unstarted_queue_worker_leaves_no_signal(self):
+        """
+        Test that stop() on a worker that never ran doesn't disturb its queue.
+        """
+        processed_items = []
+        q = Queue()
+        running = spawn_queue_worker(q, processed_items.append, poll_interval=0.01)
+        unstarted = QueueWorker(q, processed_items.append)
+
+        unstarted.stop()
+        self.assertTrue(q.empty())
+
+        q.put("item")
+        q.join()
+        self.assertEqual(processed_items, ["item"])
+
+        running.stop()
+        running.join(timeout=1)
+        self.assertFalse(running.is_alive())
+        self.assertTrue(q.empty())
+
+    def test_queue_worker_stopped_before_start_exits(self):
+        """
+        Test that a worker stopped before it is started exits once started.
+        """
+        worker = QueueWorker(Queue(), lambda item: None, poll_interval=0.01)
+        worker.stop()
+        worker.start()
+        worker.join(timeout=1)
+        self.assertFalse(worker.is_alive())
+
+    def test_idle_worker_does_not_spin_while_a_peer_stops(self):
+        """
+        Test that an idle worker keeps blocking while a busy peer is stopped.
+        """
+
+        class CountingQueue(Queue):
+            gets = 0
+
+            def get(self, *args, **kwargs):
+                CountingQueue.gets += 1
+                return super().get(*args, **kwargs)
+
+        started, release = threading.Event(), threading.Event()
+
+        def slow(item):
+            started.set()
+            release.wait(1)
+
+        q = CountingQueue()
+        busy = spawn_queue_worker(q, slow, poll_interval=0.05)
+        q.put("item")
+        self.assertTrue(started.wait(1))
+        idle = spawn_queue_worker(q, slow, poll_interval=0.05)
+
+        busy.stop()
+        gets_before = CountingQueue.gets
+        time.sleep(0.2)
+        # About one timed-out get() per poll interval, not a busy loop.
+        self.assertLess(CountingQueue.gets - gets_before, 20)
+
+        release.set()
+        busy.join(timeout=1)
+        self.assertFalse(busy.is_alive())
+        self.assertTrue(idle.is_alive())
+        idle.stop()
+        idle.join(timeout=1)
+        self.assertFalse(idle.is_alive())
+
 
 if __name__ == "__main__":
     unittest.main()